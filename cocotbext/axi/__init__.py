@@ -24,11 +24,14 @@ THE SOFTWARE.
 
 from .version import __version__
 
+from .banner import set_quiet
+
 from .constants import AxiBurstType, AxiBurstSize, AxiLockType, AxiCacheBit, AxiProt, AxiResp
 
 from .address_space import MemoryInterface, Window, WindowPool
 from .address_space import Region, MemoryRegion, SparseMemoryRegion, PeripheralRegion
 from .address_space import AddressSpace, Pool
+from .register_bank import RegisterField, Register, RegisterBank
 
 from .axis import AxiStreamFrame, AxiStreamBus, AxiStreamSource, AxiStreamSink, AxiStreamMonitor
 
@@ -44,4 +47,4 @@ from .axi_master import AxiMasterWrite, AxiMasterRead, AxiMaster
 from .axi_slave import AxiSlaveWrite, AxiSlaveRead, AxiSlave
 from .axi_ram import AxiRamWrite, AxiRamRead, AxiRam
 
-from .apb import ApbBus, ApbMaster, ApbSlave, ApbRam
+from .apb import ApbBus, ApbMaster, ApbSlave, ApbRam, ApbInterconnect
@@ -22,11 +22,16 @@ THE SOFTWARE.
 
 """
 
+import bisect
+import inspect
 import mmap
 
 from .buddy_allocator import BuddyAllocator
+from .memory_image import iter_image
 from .sparse_memory import SparseMemory
-from .utils import hexdump, hexdump_lines, hexdump_str
+from .watchpoint import Watchpoints
+from .utils import hexdump, hexdump_lines, hexdump_str, fill_pattern, page_digest, combine_digests, DIGEST_BLOCK_SIZE
+from .utils import pack_words, unpack_words, words_to_array, words_to_ndarray
 
 
 class MemoryInterface:
@@ -72,11 +77,13 @@ class MemoryInterface:
         return await self._read(address, length, **kwargs)
 
     async def read_words(self, address, count, byteorder='little', ws=2, **kwargs):
-        data = bytes(await self.read(address, count*ws, **kwargs))
-        words = []
-        for k in range(count):
-            words.append(int.from_bytes(data[ws*k:ws*(k+1)], byteorder))
-        return words
+        return unpack_words(bytes(await self.read(address, count*ws, **kwargs)), ws, byteorder)
+
+    async def read_words_array(self, address, count, byteorder='little', ws=2, **kwargs):
+        return words_to_array(bytes(await self.read(address, count*ws, **kwargs)), ws, byteorder)
+
+    async def read_words_ndarray(self, address, count, byteorder='little', ws=2, **kwargs):
+        return words_to_ndarray(bytes(await self.read(address, count*ws, **kwargs)), ws, byteorder)
 
     async def read_dwords(self, address, count, byteorder='little', **kwargs):
         return await self.read_words(address, count, byteorder, 4, **kwargs)
@@ -104,11 +111,7 @@ class MemoryInterface:
         await self._write(address, data, **kwargs)
 
     async def write_words(self, address, data, byteorder='little', ws=2, **kwargs):
-        words = data
-        data = bytearray()
-        for w in words:
-            data.extend(w.to_bytes(ws, byteorder))
-        await self.write(address, data, **kwargs)
+        await self.write(address, pack_words(data, ws, byteorder), **kwargs)
 
     async def write_dwords(self, address, data, byteorder='little', **kwargs):
         await self.write_words(address, data, byteorder, 4, **kwargs)
@@ -128,6 +131,41 @@ class MemoryInterface:
     async def write_qword(self, address, data, byteorder='little', **kwargs):
         await self.write_qwords(address, [data], byteorder, **kwargs)
 
+    async def _fill(self, address, length, pattern, **kwargs):
+        offset = 0
+        while offset < length:
+            block_len = min(65536, length-offset)
+            await self.write(address+offset, fill_pattern(pattern, block_len, offset), **kwargs)
+            offset += block_len
+
+    async def fill(self, address, length, pattern=b'\x00', **kwargs):
+        self.check_range(address, length)
+        await self._fill(address, length, pattern, **kwargs)
+
+    async def _copy(self, dst, src, length, **kwargs):
+        if src < dst < src+length:
+            # overlapping, copy backwards
+            offset = length
+            while offset > 0:
+                block_len = min(65536, offset)
+                offset -= block_len
+                await self.write(dst+offset, await self.read(src+offset, block_len, **kwargs), **kwargs)
+        else:
+            offset = 0
+            while offset < length:
+                block_len = min(65536, length-offset)
+                await self.write(dst+offset, await self.read(src+offset, block_len, **kwargs), **kwargs)
+                offset += block_len
+
+    async def copy(self, dst, src, length, **kwargs):
+        self.check_range(dst, length)
+        self.check_range(src, length)
+        await self._copy(dst, src, length, **kwargs)
+
+    async def load_image(self, path, fmt=None, base=0, **kwargs):
+        for address, data in iter_image(path, fmt, base):
+            await self.write(address, data, **kwargs)
+
     def create_window(self, offset, size=None, window_type=None):
         if not size or size < 0:
             size = self.size - offset
@@ -135,7 +173,8 @@ class MemoryInterface:
         self.check_range(offset, size)
         return window_type(self, offset, size, base=self.get_absolute_address(offset))
 
-    def create_window_pool(self, offset=None, size=None, window_pool_type=None, window_type=None):
+    def create_window_pool(self, offset=None, size=None, window_pool_type=None, window_type=None, allocator_type=None,
+            allocator_kwargs=None):
         if offset is None:
             offset = 0
         if size is None:
@@ -143,7 +182,8 @@ class MemoryInterface:
         window_pool_type = window_pool_type or self.window_pool_type or WindowPool
         window_type = window_type or self.window_type
         self.check_range(offset, size)
-        return window_pool_type(self, offset, size, base=self.get_absolute_address(offset), window_type=window_type)
+        return window_pool_type(self, offset, size, base=self.get_absolute_address(offset),
+            window_type=window_type, allocator_type=allocator_type, allocator_kwargs=allocator_kwargs)
 
     def __len__(self):
         return self._size
@@ -153,32 +193,73 @@ class Window(MemoryInterface):
     def __init__(self, parent, offset, size, base=0, **kwargs):
         super().__init__(size, base=base, parent=parent, **kwargs)
         self._offset = offset
+        # subclasses overriding get_parent_address translate every access
+        self._translated = type(self).get_parent_address is not Window.get_parent_address
+
+        # skip over parent windows that only translate addresses
+        if isinstance(parent, Window) and parent._is_passthrough():
+            self._target = parent._target
+            self._target_offset = parent._target_offset + offset
+        else:
+            self._target = parent
+            self._target_offset = offset
 
     @property
     def offset(self):
         return self._offset
 
+    def _is_passthrough(self):
+        cls = type(self)
+        return (cls.read is MemoryInterface.read and cls.write is MemoryInterface.write
+            and cls._read is Window._read and cls._write is Window._write
+            and cls._fill is Window._fill and cls._copy is Window._copy
+            and not self._translated)
+
     def get_parent_address(self, address):
         if address < 0 or address >= self.size:
             raise ValueError("address out of range")
         return address+self.offset
 
     async def _read(self, address, length, **kwargs):
-        return await self.parent.read(self.get_parent_address(address), length, **kwargs)
+        if self._translated:
+            return await self.parent.read(self.get_parent_address(address), length, **kwargs)
+        return await self._target.read(address+self._target_offset, length, **kwargs)
 
     async def _write(self, address, data, **kwargs):
-        await self.parent.write(self.get_parent_address(address), data, **kwargs)
+        if self._translated:
+            await self.parent.write(self.get_parent_address(address), data, **kwargs)
+        else:
+            await self._target.write(address+self._target_offset, data, **kwargs)
+
+    async def _fill(self, address, length, pattern, **kwargs):
+        if self._translated:
+            await super()._fill(address, length, pattern, **kwargs)
+        else:
+            await self._target.fill(address+self._target_offset, length, pattern, **kwargs)
+
+    async def _copy(self, dst, src, length, **kwargs):
+        if self._translated:
+            await super()._copy(dst, src, length, **kwargs)
+        else:
+            await self._target.copy(dst+self._target_offset, src+self._target_offset, length, **kwargs)
 
 
 class WindowPool(Window):
-    def __init__(self, parent, offset, size, base=None, window_type=None, **kwargs):
+    def __init__(self, parent, offset, size, base=None, window_type=None, allocator_type=None, allocator_kwargs=None,
+            **kwargs):
         super().__init__(parent, offset, size, base=base, **kwargs)
         self.window_type = window_type or Window
-        self.allocator = BuddyAllocator(size)
+        self.allocator_type = allocator_type or BuddyAllocator
+        self.allocator = self.allocator_type(size, **(allocator_kwargs or {}))
 
     def alloc_window(self, size, window_type=None):
         return self.create_window(self.allocator.alloc(size), size, window_type)
 
+    def free_window(self, window):
+        if window.parent is not self:
+            raise ValueError("window not allocated from this pool")
+        self.allocator.free(window.offset)
+
 
 class Region(MemoryInterface):
     def __init__(self, size, **kwargs):
@@ -186,18 +267,112 @@ class Region(MemoryInterface):
 
 
 class MemoryRegion(Region):
-    def __init__(self, size=4096, mem=None, **kwargs):
+    def __init__(self, size=4096, mem=None, cache_digests=None, **kwargs):
         super().__init__(size, **kwargs)
+        # a caller-supplied buffer can be modified behind our back, so only
+        # cache digests by default when the region owns the buffer
+        if cache_digests is None:
+            cache_digests = mem is None
         if mem is None:
             mem = mmap.mmap(-1, size)
         self.mem = mem
+        self.watchpoints = None
+        self.cache_digests = cache_digests
+        self._digests = {}
+
+    @classmethod
+    def from_file(cls, path, size=None, offset=0, access='copy', **kwargs):
+        if access == 'read':
+            mode, access = 'rb', mmap.ACCESS_READ
+        elif access == 'copy':
+            mode, access = 'rb', mmap.ACCESS_COPY
+        elif access == 'write':
+            mode, access = 'r+b', mmap.ACCESS_WRITE
+        else:
+            raise ValueError("invalid access mode")
+        with open(path, mode) as f:
+            file_size = f.seek(0, 2)
+            if size is None:
+                size = file_size - offset
+            if offset+size > file_size:
+                if access != mmap.ACCESS_WRITE:
+                    raise ValueError("size larger than file")
+                f.truncate(offset+size)
+            mem = mmap.mmap(f.fileno(), size, access=access, offset=offset)
+        kwargs.setdefault('cache_digests', True)
+        return cls(size, mem, **kwargs)
+
+    def flush(self):
+        self.mem.flush()
 
     async def _read(self, address, length, **kwargs):
-        return self.mem[address:address+length]
+        data = self.mem[address:address+length]
+        wp = self.watchpoints
+        if wp is not None and address < wp.hi and address+length > wp.lo:
+            wp.check('r', address, data)
+        return data
 
     async def _write(self, address, data, **kwargs):
+        wp = self.watchpoints
+        if wp is not None and address < wp.hi and address+len(data) > wp.lo:
+            wp.check('w', address, data)
+        if self._digests:
+            self.invalidate_digests(address, len(data))
         self.mem[address:address+len(data)] = data
 
+    async def _copy(self, dst, src, length, **kwargs):
+        wp = self.watchpoints
+        if wp is not None and (dst < wp.hi and dst+length > wp.lo or src < wp.hi and src+length > wp.lo):
+            await self._write(dst, await self._read(src, length))
+        else:
+            if self._digests:
+                self.invalidate_digests(dst, length)
+            self.mem.move(dst, src, length)
+
+    def invalidate_digests(self, address=0, length=None):
+        if length is None:
+            self._digests.clear()
+            return
+        ps = DIGEST_BLOCK_SIZE
+        for page in range(address // ps, (address+max(length, 1)-1) // ps + 1):
+            self._digests.pop(page, None)
+
+    def _page_digest(self, page):
+        digest = self._digests.get(page)
+        if digest is None:
+            ps = DIGEST_BLOCK_SIZE
+            data = self.mem[page*ps:(page+1)*ps]
+            digest = page_digest(data) if any(data) else b''
+            if self.cache_digests:
+                self._digests[page] = digest
+        return digest
+
+    def _iter_digests(self, address, length):
+        ps = DIGEST_BLOCK_SIZE
+        end = address+length
+        for page in range(address // ps, (end+ps-1) // ps):
+            a = max(page*ps, address)
+            b = min((page+1)*ps, end)
+            if a == page*ps and (b == (page+1)*ps or b == self.size):
+                digest = self._page_digest(page)
+                if digest:
+                    yield a, digest
+            else:
+                data = self.mem[a:b]
+                if any(data):
+                    yield a, page_digest(data)
+
+    def digest(self, address=0, length=None):
+        if length is None:
+            length = self.size - address
+        self.check_range(address, length)
+        return combine_digests(self._iter_digests(address, length))
+
+    def equals(self, other, address=0, length=None):
+        if length is None:
+            length = self.size - address
+        return self.digest(address, length) == other.digest(address, length)
+
     def hexdump(self, address, length, prefix=""):
         hexdump(self.mem[address:address+length], prefix=prefix, offset=address)
 
@@ -211,17 +386,43 @@ class MemoryRegion(Region):
         return self.mem[key]
 
     def __setitem__(self, key, value):
+        if self._digests:
+            if isinstance(key, slice):
+                start, stop, step = key.indices(self.size)
+                if step == 1:
+                    self.invalidate_digests(start, stop-start)
+                else:
+                    self.invalidate_digests()
+            else:
+                self.invalidate_digests(key, 1)
         self.mem[key] = value
 
+    def watch(self, address, length, callback=None, read=False, write=True):
+        if self.watchpoints is None:
+            self.watchpoints = Watchpoints()
+        return self.watchpoints.add(address, length, callback, read, write)
+
+    def unwatch(self, handle):
+        if self.watchpoints is None:
+            raise ValueError("unknown watchpoint")
+        self.watchpoints.remove(handle)
+
+    def snapshot(self):
+        return bytes(self.mem)
+
+    def restore(self, snapshot):
+        self.mem[:] = snapshot
+        self._digests.clear()
+
     def __bytes__(self):
         return bytes(self.mem)
 
 
 class SparseMemoryRegion(Region):
-    def __init__(self, size=2**64, mem=None, **kwargs):
+    def __init__(self, size=2**64, mem=None, page_size=4096, **kwargs):
         super().__init__(size, **kwargs)
         if mem is None:
-            mem = SparseMemory(size)
+            mem = SparseMemory(size, page_size)
         self.mem = mem
 
     async def _read(self, address, length, **kwargs):
@@ -230,6 +431,12 @@ class SparseMemoryRegion(Region):
     async def _write(self, address, data, **kwargs):
         self.mem.write(address, data)
 
+    async def _fill(self, address, length, pattern, **kwargs):
+        self.mem.fill(address, length, pattern)
+
+    async def _copy(self, dst, src, length, **kwargs):
+        self.mem.copy(dst, src, length)
+
     def hexdump(self, address, length, prefix=""):
         self.mem.hexdump(address, length, prefix=prefix)
 
@@ -239,6 +446,30 @@ class SparseMemoryRegion(Region):
     def hexdump_str(self, address, length, prefix=""):
         return self.mem.hexdump_str(address, length, prefix=prefix)
 
+    def watch(self, address, length, callback=None, read=False, write=True):
+        return self.mem.watch(address, length, callback, read, write)
+
+    def unwatch(self, handle):
+        self.mem.unwatch(handle)
+
+    @property
+    def watchpoints(self):
+        return self.mem.watchpoints
+
+    def digest(self, address=0, length=None):
+        return self.mem.digest(address, length)
+
+    def equals(self, other, address=0, length=None):
+        if isinstance(other, SparseMemoryRegion):
+            other = other.mem
+        return self.mem.equals(other, address, length)
+
+    def snapshot(self):
+        return self.mem.snapshot()
+
+    def restore(self, snapshot):
+        self.mem.restore(snapshot)
+
     def __getitem__(self, key):
         return self.mem[key]
 
@@ -251,17 +482,32 @@ class PeripheralRegion(Region):
         super().__init__(size, **kwargs)
         self.obj = obj
 
+    @property
+    def obj(self):
+        return self._obj
+
+    @obj.setter
+    def obj(self, obj):
+        # determine once whether the wrapped methods must be awaited
+        self._obj = obj
+        self._obj_read_async = inspect.iscoroutinefunction(getattr(obj, 'read', None))
+        self._obj_write_async = inspect.iscoroutinefunction(getattr(obj, 'write', None))
+
     async def _read(self, address, length, **kwargs):
-        try:
-            return await self.obj.read(address, length, **kwargs)
-        except TypeError:
-            return self.obj.read(address, length, **kwargs)
+        if self._obj_read_async:
+            return await self._obj.read(address, length, **kwargs)
+        data = self._obj.read(address, length, **kwargs)
+        if inspect.isawaitable(data):
+            data = await data
+        return data
 
     async def _write(self, address, data, **kwargs):
-        try:
-            await self.obj.write(address, data, **kwargs)
-        except TypeError:
-            self.obj.write(address, data, **kwargs)
+        if self._obj_write_async:
+            await self._obj.write(address, data, **kwargs)
+            return
+        ret = self._obj.write(address, data, **kwargs)
+        if inspect.isawaitable(ret):
+            await ret
 
 
 class AddressSpace(Region):
@@ -269,18 +515,37 @@ class AddressSpace(Region):
         super().__init__(size=size, base=base, parent=parent, **kwargs)
         self.pool_type = Pool
         self.regions = []
+        self._region_bases = []
+        self._last_region = None
 
     def find_regions(self, address, length=1):
-        regions = []
         if address < 0 or address >= self.size:
             raise ValueError("address out of range")
         if length < 0:
             raise ValueError("invalid length")
         length = max(length, 1)
-        for (base, size, translate, region) in self.regions:
-            if address < base+size and base < address+length:
-                regions.append((base, size, translate, region))
-        regions.sort()
+
+        # fast path: access falls entirely within the last region hit
+        last = self._last_region
+        if last is not None and last[0] <= address and address+length <= last[0]+last[1]:
+            return [last]
+
+        # regions cannot overlap, so sorting by base also sorts by end address
+        index = bisect.bisect_right(self._region_bases, address) - 1
+        if index < 0:
+            index = 0
+
+        regions = []
+        while index < len(self.regions):
+            base, size, offset, region = self.regions[index]
+            if base >= address+length:
+                break
+            if address < base+size:
+                regions.append(self.regions[index])
+            index += 1
+
+        if len(regions) == 1:
+            self._last_region = regions[0]
         return regions
 
     def register_region(self, region, base, size=None, offset=0):
@@ -293,7 +558,26 @@ class AddressSpace(Region):
             region._base = self.get_absolute_address(base)
         else:
             region._base = None
-        self.regions.append((base, size, offset, region))
+        index = bisect.bisect_right(self._region_bases, base)
+        self._region_bases.insert(index, base)
+        self.regions.insert(index, (base, size, offset, region))
+
+    def unregister_region(self, region, base=None):
+        if base is None:
+            indices = [k for k, r in enumerate(self.regions) if r[3] is region]
+        else:
+            index = bisect.bisect_left(self._region_bases, base)
+            indices = []
+            while index < len(self.regions) and self.regions[index][0] == base:
+                if self.regions[index][3] is region:
+                    indices.append(index)
+                index += 1
+        if not indices:
+            raise ValueError("unknown region")
+        for index in reversed(indices):
+            del self._region_bases[index]
+            del self.regions[index]
+        self._last_region = None
 
     async def read(self, address, length, **kwargs):
         regions = self.find_regions(address, length)
@@ -336,27 +620,85 @@ class AddressSpace(Region):
         if length > 0:
             raise Exception("Invalid address")
 
-    def create_pool(self, base=None, size=None, pool_type=None, region_type=None):
+    async def fill(self, address, length, pattern=b'\x00', **kwargs):
+        if isinstance(pattern, int):
+            pattern = bytes([pattern])
+        regions = self.find_regions(address, length)
+        if not regions:
+            raise Exception("Invalid address")
+        start = 0
+        for base, size, offset, region in regions:
+            if base > address:
+                raise Exception("Invalid address")
+            seg_addr = address - base
+            seg_len = min(size-seg_addr, length)
+            if offset is None:
+                seg_addr = address
+                offset = 0
+            await region.fill(seg_addr+offset, seg_len, fill_pattern(pattern, len(pattern), start), **kwargs)
+            address += seg_len
+            start += seg_len
+            length -= seg_len
+        if length > 0:
+            raise Exception("Invalid address")
+
+    async def copy(self, dst, src, length, **kwargs):
+        if length > 0:
+            dst_regions = self.find_regions(dst, length)
+            src_regions = self.find_regions(src, length)
+            if len(dst_regions) == 1 and dst_regions[0] == src_regions[0] and len(src_regions) == 1:
+                base, size, offset, region = dst_regions[0]
+                if base <= min(dst, src) and max(dst, src)+length <= base+size:
+                    # both ranges within the same region
+                    if offset is None:
+                        await region.copy(dst, src, length, **kwargs)
+                    else:
+                        await region.copy(dst-base+offset, src-base+offset, length, **kwargs)
+                    return
+        await self._copy(dst, src, length, **kwargs)
+
+    def create_pool(self, base=None, size=None, pool_type=None, region_type=None, allocator_type=None,
+            allocator_kwargs=None):
         if base is None:
             base = 0
         if size is None:
             size = self.size - base
         pool_type = pool_type or self.pool_type or Pool
         self.check_range(base, size)
-        pool = pool_type(self, base, size, region_type=region_type)
+        pool = pool_type(self, base, size, region_type=region_type, allocator_type=allocator_type,
+            allocator_kwargs=allocator_kwargs)
         self.register_region(pool, base, size)
         return pool
 
 
 class Pool(AddressSpace):
-    def __init__(self, parent, base, size, region_type=None, **kwargs):
+    def __init__(self, parent, base, size, region_type=None, allocator_type=None, allocator_kwargs=None, **kwargs):
         super().__init__(parent=parent, base=base, size=size, **kwargs)
         self.region_type = region_type or MemoryRegion
-        self.allocator = BuddyAllocator(size)
+        self.allocator_type = allocator_type or BuddyAllocator
+        self.allocator = self.allocator_type(size, **(allocator_kwargs or {}))
+        self.allocations = {}
 
     def alloc_region(self, size, region_type=None):
         region_type = region_type or self.region_type or MemoryRegion
         base = self.allocator.alloc(size)
         region = region_type(size)
         self.register_region(region, base)
+        self.allocations[region] = base
         return region
+
+    def free_region(self, region):
+        try:
+            base = self.allocations.pop(region)
+        except KeyError:
+            raise ValueError("unknown allocation")
+        self.unregister_region(region, base)
+        self.allocator.free(base)
+
+    def free_all(self):
+        self.regions = [r for r in self.regions if r[3] not in self.allocations]
+        self._region_bases = [r[0] for r in self.regions]
+        self._last_region = None
+        for base in self.allocations.values():
+            self.allocator.free(base)
+        self.allocations.clear()
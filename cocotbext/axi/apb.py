@@ -23,17 +23,20 @@ THE SOFTWARE.
 """
 
 import logging
+import random
 from typing import NamedTuple
 
 import cocotb
 from cocotb.queue import Queue
-from cocotb.triggers import RisingEdge, Event
+from cocotb.triggers import RisingEdge, Edge, Event
+from cocotb.utils import get_sim_time
 from cocotb_bus.bus import Bus
 
-from .version import __version__
 from .constants import AxiResp, AxiProt
-from .address_space import Region
+from .address_space import MemoryInterface, Region, PeripheralRegion, AddressSpace
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 from .memory import Memory
 
 
@@ -127,8 +130,8 @@ class ApbPause:
             await clock_edge_event
 
 
-class ApbMaster(ApbPause, Region, Reset):
-    def __init__(self, bus, clock, reset=None, reset_active_level=True, **kwargs):
+class ApbMaster(ApbPause, Region, Reset, SignalReport):
+    def __init__(self, bus, clock, reset=None, reset_active_level=True, back_to_back=False, **kwargs):
         self.bus = bus
         self.clock = clock
         self.reset = reset
@@ -137,45 +140,42 @@ class ApbMaster(ApbPause, Region, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus._entity._name}")
 
-        self.log.info("APB master")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "APB master", "Copyright (c) 2025 Alex Forencich")
 
         self.command_queue = Queue()
         self.command_queue.queue_occupancy_limit = 2
         self.current_command = None
 
+        self.back_to_back = back_to_back
+
         self.in_flight_operations = 0
         self._idle = Event()
         self._idle.set()
 
-        self.address_width = len(self.bus.paddr)
-        self.width = len(self.bus.pwdata)
+        shape = bus_shape(self.bus)
+
+        self.address_width = shape.width("paddr")
+        self.width = shape.width("pwdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
 
-        self.pprot_present = hasattr(self.bus, "pprot")
-        self.pstrb_present = hasattr(self.bus, "pstrb")
-        self.pslverr_present = hasattr(self.bus, "pslverr")
+        self.pprot_present = shape.has("pprot")
+        self.pstrb_present = shape.has("pstrb")
+        self.pslverr_present = shape.has("pslverr")
 
         super().__init__(2**self.address_width, **kwargs)
 
-        self.log.info("APB master configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("APB master configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  Back-to-back: %s", self.back_to_back)
 
-        self.log.info("APB master signals:")
-        for sig in sorted(list(set().union(self.bus._signals, self.bus._optional_signals))):
-            if hasattr(bus, sig):
-                self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-            else:
-                self.log.info("  %s: not present", sig)
+        self._init_signal_report("APB master signals:", (self.bus,))
 
         if self.pstrb_present:
-            assert self.byte_lanes == len(self.bus.pstrb)
+            assert self.byte_lanes == shape.width("pstrb")
         assert self.byte_lanes * self.byte_size == self.width
 
         self.bus.paddr.setimmediatevalue(0)
@@ -336,10 +336,16 @@ class ApbMaster(ApbPause, Region, Reset):
 
         await clock_edge_event
 
+        last_edge_time = None
+
         while True:
             if self.command_queue.empty():
                 cmd = await self.command_queue.get()
-                await clock_edge_event
+                # in back-to-back mode, a command issued in the same time step
+                # as the end of the previous transfer keeps psel asserted and
+                # starts the next setup phase immediately
+                if not self.back_to_back or get_sim_time() != last_edge_time:
+                    await clock_edge_event
             else:
                 cmd = self.command_queue.get_nowait()
             self.current_command = cmd
@@ -423,6 +429,9 @@ class ApbMaster(ApbPause, Region, Reset):
                 while not int(self.bus.pready.value):
                     await clock_edge_event
 
+                if self.back_to_back:
+                    last_edge_time = get_sim_time()
+
                 self.bus.penable.value = False
 
                 cycle_data = int(self.bus.prdata.value)
@@ -462,7 +471,7 @@ class ApbMaster(ApbPause, Region, Reset):
                 self._idle.set()
 
 
-class ApbSlave(ApbPause, Reset):
+class ApbSlave(ApbPause, Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -473,44 +482,54 @@ class ApbSlave(ApbPause, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus._entity._name}")
 
-        self.log.info("APB slave model")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "APB slave model", "Copyright (c) 2025 Alex Forencich")
 
         super().__init__(**kwargs)
 
-        self.address_width = len(self.bus.paddr)
-        self.width = len(self.bus.pwdata)
+        shape = bus_shape(self.bus)
+
+        self.address_width = shape.width("paddr")
+        self.width = shape.width("pwdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
 
-        self.pprot_present = hasattr(self.bus, "pprot")
-        self.pstrb_present = hasattr(self.bus, "pstrb")
-        self.pslverr_present = hasattr(self.bus, "pslverr")
+        self.pprot_present = shape.has("pprot")
+        self.pstrb_present = shape.has("pstrb")
+        self.pslverr_present = shape.has("pslverr")
 
-        self.log.info("APB slave model configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        # psel may be a vector with one bit per slave, in which case pready,
+        # prdata, and pslverr may also be split into one lane per psel bit
+        self.psel_width = shape.width("psel")
+        self.resp_lanes = shape.width("pready")
 
-        self.log.info("APB slave model signals:")
-        for sig in sorted(list(set().union(self.bus._signals, self.bus._optional_signals))):
-            if hasattr(bus, sig):
-                self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-            else:
-                self.log.info("  %s: not present", sig)
+        self._log_config("APB slave model configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        if self.psel_width > 1:
+            self._log_config("  psel width: %d bits", self.psel_width)
+            self._log_config("  Response lanes: %d", self.resp_lanes)
+
+        self._init_signal_report("APB slave model signals:", (self.bus,))
 
         if self.pstrb_present:
-            assert self.byte_lanes == len(self.bus.pstrb)
+            assert self.byte_lanes == shape.width("pstrb")
         assert self.byte_lanes * self.byte_size == self.width
+        assert self.resp_lanes in (1, self.psel_width)
+        assert shape.width("prdata") == self.width * self.resp_lanes
+        if self.pslverr_present:
+            assert shape.width("pslverr") == self.resp_lanes
 
         self.bus.pready.setimmediatevalue(False)
         self.bus.prdata.setimmediatevalue(0)
         if self.pslverr_present:
             self.bus.pslverr.setimmediatevalue(0)
 
+        # per-address-range wait states and error injection, for [read, write]
+        self._wait_ranges = [[], []]
+        self._error_ranges = [[], []]
+
         self._run_cr = None
 
         self._init_reset(reset, reset_active_level)
@@ -521,6 +540,51 @@ class ApbSlave(ApbPause, Reset):
     async def _read(self, address, length):
         return await self.target.read(address, length)
 
+    @staticmethod
+    def _add_range(ranges, base, size, val):
+        if size is None:
+            size = 2**64
+        ranges.append((base, base+size, val))
+
+    @staticmethod
+    def _lookup_range(ranges, address):
+        # most recently added range takes precedence
+        for start, end, val in reversed(ranges):
+            if start <= address < end:
+                return val
+        return None
+
+    def set_wait_states(self, wait, base=0, size=None, read=True, write=True):
+        if isinstance(wait, int):
+            if wait < 0:
+                raise ValueError("Wait states must be non-negative")
+        elif isinstance(wait, tuple):
+            lo, hi = wait
+            wait = lambda address, pwrite: random.randint(lo, hi)  # noqa: E731
+        elif not callable(wait):
+            # no wait states once the iterable is exhausted
+            it = iter(wait)
+            wait = lambda address, pwrite: next(it, 0)  # noqa: E731
+
+        if read:
+            self._add_range(self._wait_ranges[0], base, size, wait)
+        if write:
+            self._add_range(self._wait_ranges[1], base, size, wait)
+
+    def clear_wait_states(self):
+        self._wait_ranges = [[], []]
+
+    def set_error(self, base=0, size=None, read=True, write=True, error=True):
+        if not self.pslverr_present and error:
+            raise ValueError("Error injection requested, but pslverr is not connected")
+        if read:
+            self._add_range(self._error_ranges[0], base, size, error)
+        if write:
+            self._add_range(self._error_ranges[1], base, size, error)
+
+    def clear_errors(self):
+        self._error_ranges = [[], []]
+
     def _handle_reset(self, state):
         if state:
             self.log.info("Reset asserted")
@@ -537,27 +601,72 @@ class ApbSlave(ApbPause, Reset):
 
     async def _run(self):
         clock_edge_event = RisingEdge(self.clock)
+        if self.psel_width > 1:
+            psel_rise_event = Edge(self.bus.psel)
+        else:
+            psel_rise_event = RisingEdge(self.bus.psel)
 
         self.bus.pready.value = False
 
         while True:
+            # sleep while idle, only sample on the clock once psel is asserted
+            if not self.bus.psel.value.is_resolvable or not int(self.bus.psel.value):
+                await psel_rise_event
+
             await clock_edge_event
 
-            if not int(self.bus.psel.value):
+            psel = int(self.bus.psel.value)
+            if not psel:
                 continue
 
+            # response lane for the selected slave
+            lane = 0
+            if self.resp_lanes > 1:
+                lane = psel.bit_length()-1
+
             addr = (int(self.bus.paddr.value) // self.byte_lanes) * self.byte_lanes
             if self.pprot_present:
                 prot = AxiProt(int(self.bus.pprot.value))
             else:
                 prot = AxiProt.NONSECURE
 
+            pwrite = int(self.bus.pwrite.value)
+
             pslverr = False
+            wait = 0
+
+            # psel must be one-hot, complete with an error on all selected lanes otherwise
+            resp_mask = 1 << lane
+            psel_error = self.psel_width > 1 and psel & (psel-1) != 0
+            if psel_error:
+                self.log.error("Multiple psel bits asserted: 0x%x paddr: 0x%08x", psel, addr)
+                pslverr = True
+                if self.resp_lanes > 1:
+                    resp_mask = psel
+
+            if self._wait_ranges[pwrite]:
+                wait = self._lookup_range(self._wait_ranges[pwrite], addr)
+                if wait is None:
+                    wait = 0
+                elif not isinstance(wait, int):
+                    wait = wait(addr, bool(pwrite))
+
+            if self._error_ranges[pwrite] and self._lookup_range(self._error_ranges[pwrite], addr):
+                pslverr = True
 
             while self.pause:
                 await clock_edge_event
 
-            if (int(self.bus.pwrite.value)):
+            for k in range(wait):
+                await clock_edge_event
+
+            if pslverr:
+                if not psel_error and self.log.isEnabledFor(logging.INFO):
+                    self.log.info("Injected error paddr: 0x%08x pprot: %s pwrite: %d", addr, prot, pwrite)
+
+                if not pwrite:
+                    self.bus.prdata.value = 0
+            elif pwrite:
                 data = int(self.bus.pwdata.value)
 
                 if self.pstrb_present:
@@ -609,11 +718,11 @@ class ApbSlave(ApbPause, Reset):
                     self.log.info("Read data paddr: 0x%08x pprot: %s data: %s",
                             addr, prot, ' '.join((f'{c:02x}' for c in data)))
 
-                self.bus.prdata.value = int.from_bytes(data, 'little')
+                self.bus.prdata.value = int.from_bytes(data, 'little') << lane*self.width
 
             if self.pslverr_present:
-                self.bus.pslverr.value = pslverr
-            self.bus.pready.value = True
+                self.bus.pslverr.value = resp_mask if pslverr else 0
+            self.bus.pready.value = resp_mask
             await clock_edge_event
 
             if not int(self.bus.psel.value):
@@ -621,7 +730,27 @@ class ApbSlave(ApbPause, Reset):
             if not int(self.bus.penable.value):
                 self.log.warning("penable not asserted")
 
-            self.bus.pready.value = False
+            self.bus.pready.value = 0
+
+
+class ApbInterconnect(ApbSlave):
+    def __init__(self, bus, clock, reset=None, reset_active_level=True, **kwargs):
+        super().__init__(bus, clock, reset, None, reset_active_level, **kwargs)
+
+        self.address_space = AddressSpace(2**self.address_width)
+        self.target = self.address_space
+
+    def add_slave(self, target, base, size=None, offset=0):
+        if not isinstance(target, MemoryInterface):
+            if size is None:
+                raise ValueError("Size must be specified for objects that are not regions")
+            target = PeripheralRegion(target, size)
+        self.address_space.register_region(target, base, size, offset)
+        return target
+
+    def remove_slave(self, target, base=None):
+        self.address_space.unregister_region(target, base)
+
 
 class ApbRam(ApbSlave, Memory):
     def __init__(self, bus, clock, reset=None, reset_active_level=True, size=2**64, mem=None, **kwargs):
@@ -30,11 +30,12 @@ import cocotb
 from cocotb.queue import Queue
 from cocotb.triggers import Event
 
-from .version import __version__
 from .constants import AxiBurstType, AxiLockType, AxiProt, AxiResp
 from .axi_channels import AxiAWSource, AxiWSource, AxiBSink, AxiARSource, AxiRSink
 from .address_space import Region
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 
 
 # AXI master write helper objects
@@ -193,7 +194,7 @@ class TagContextManager:
         return flushed_cmds
 
 
-class AxiMasterWrite(Region, Reset):
+class AxiMasterWrite(Region, Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, reset_active_level=True, max_burst_len=256, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -203,10 +204,7 @@ class AxiMasterWrite(Region, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.aw._entity._name}")
 
-        self.log.info("AXI master (write)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2020-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI master (write)", "Copyright (c) 2020-2025 Alex Forencich")
 
         self.aw_channel = AxiAWSource(bus.aw, clock, reset, reset_active_level)
         self.aw_channel.queue_occupancy_limit = 2
@@ -219,7 +217,11 @@ class AxiMasterWrite(Region, Reset):
         self.write_command_queue.queue_occupancy_limit = 2
         self.current_write_command = None
 
-        self.id_count = 2**len(self.aw_channel.bus.awid)
+        aw_shape = bus_shape(self.bus.aw)
+        w_shape = bus_shape(self.bus.w)
+        b_shape = bus_shape(self.bus.b)
+
+        self.id_count = 2**aw_shape.width("awid")
         self.cur_id = 0
         self.active_id = Counter()
 
@@ -229,9 +231,9 @@ class AxiMasterWrite(Region, Reset):
         self._idle = Event()
         self._idle.set()
 
-        self.address_width = len(self.aw_channel.bus.awaddr)
-        self.id_width = len(self.aw_channel.bus.awid)
-        self.width = len(self.w_channel.bus.wdata)
+        self.address_width = aw_shape.width("awaddr")
+        self.id_width = aw_shape.width("awid")
+        self.width = w_shape.width("wdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
@@ -239,40 +241,34 @@ class AxiMasterWrite(Region, Reset):
         self.max_burst_len = max(min(max_burst_len, 256), 1)
         self.max_burst_size = (self.byte_lanes-1).bit_length()
 
-        self.awlock_present = hasattr(self.bus.aw, "awlock")
-        self.awcache_present = hasattr(self.bus.aw, "awcache")
-        self.awprot_present = hasattr(self.bus.aw, "awprot")
-        self.awqos_present = hasattr(self.bus.aw, "awqos")
-        self.awregion_present = hasattr(self.bus.aw, "awregion")
-        self.awuser_present = hasattr(self.bus.aw, "awuser")
-        self.wstrb_present = hasattr(self.bus.w, "wstrb")
-        self.wuser_present = hasattr(self.bus.w, "wuser")
-        self.buser_present = hasattr(self.bus.b, "buser")
+        self.awlock_present = aw_shape.has("awlock")
+        self.awcache_present = aw_shape.has("awcache")
+        self.awprot_present = aw_shape.has("awprot")
+        self.awqos_present = aw_shape.has("awqos")
+        self.awregion_present = aw_shape.has("awregion")
+        self.awuser_present = aw_shape.has("awuser")
+        self.wstrb_present = w_shape.has("wstrb")
+        self.wuser_present = w_shape.has("wuser")
+        self.buser_present = b_shape.has("buser")
 
         super().__init__(2**self.address_width, **kwargs)
 
-        self.log.info("AXI master configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  ID width: %d bits", self.id_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
-        self.log.info("  Max burst size: %d (%d bytes)", self.max_burst_size, 2**self.max_burst_size)
-        self.log.info("  Max burst length: %d cycles (%d bytes)",
+        self._log_config("AXI master configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  ID width: %d bits", self.id_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  Max burst size: %d (%d bytes)", self.max_burst_size, 2**self.max_burst_size)
+        self._log_config("  Max burst length: %d cycles (%d bytes)",
             self.max_burst_len, self.max_burst_len*self.byte_lanes)
 
-        self.log.info("AXI master signals:")
-        for bus in (self.bus.aw, self.bus.w, self.bus.b):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI master signals:", (self.bus.aw, self.bus.w, self.bus.b))
 
         if self.wstrb_present:
-            assert self.byte_lanes == len(self.w_channel.bus.wstrb)
+            assert self.byte_lanes == w_shape.width("wstrb")
         assert self.byte_lanes * self.byte_size == self.width
 
-        assert len(self.b_channel.bus.bid) == len(self.aw_channel.bus.awid)
+        assert b_shape.width("bid") == aw_shape.width("awid")
 
         self._process_write_cr = None
         self._process_write_resp_cr = None
@@ -635,7 +631,7 @@ class AxiMasterWrite(Region, Reset):
             self._idle.set()
 
 
-class AxiMasterRead(Region, Reset):
+class AxiMasterRead(Region, Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, reset_active_level=True, max_burst_len=256, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -645,10 +641,7 @@ class AxiMasterRead(Region, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.ar._entity._name}")
 
-        self.log.info("AXI master (read)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2020-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI master (read)", "Copyright (c) 2020-2025 Alex Forencich")
 
         self.ar_channel = AxiARSource(bus.ar, clock, reset, reset_active_level)
         self.ar_channel.queue_occupancy_limit = 2
@@ -659,7 +652,10 @@ class AxiMasterRead(Region, Reset):
         self.read_command_queue.queue_occupancy_limit = 2
         self.current_read_command = None
 
-        self.id_count = 2**len(self.ar_channel.bus.arid)
+        ar_shape = bus_shape(self.bus.ar)
+        r_shape = bus_shape(self.bus.r)
+
+        self.id_count = 2**ar_shape.width("arid")
         self.cur_id = 0
         self.active_id = Counter()
 
@@ -669,45 +665,39 @@ class AxiMasterRead(Region, Reset):
         self._idle = Event()
         self._idle.set()
 
-        self.address_width = len(self.ar_channel.bus.araddr)
-        self.id_width = len(self.ar_channel.bus.arid)
-        self.width = len(self.r_channel.bus.rdata)
+        self.address_width = ar_shape.width("araddr")
+        self.id_width = ar_shape.width("arid")
+        self.width = r_shape.width("rdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
 
         self.max_burst_len = max(min(max_burst_len, 256), 1)
         self.max_burst_size = (self.byte_lanes-1).bit_length()
 
-        self.arlock_present = hasattr(self.bus.ar, "arlock")
-        self.arcache_present = hasattr(self.bus.ar, "arcache")
-        self.arprot_present = hasattr(self.bus.ar, "arprot")
-        self.arqos_present = hasattr(self.bus.ar, "arqos")
-        self.arregion_present = hasattr(self.bus.ar, "arregion")
-        self.aruser_present = hasattr(self.bus.ar, "aruser")
-        self.ruser_present = hasattr(self.bus.r, "ruser")
+        self.arlock_present = ar_shape.has("arlock")
+        self.arcache_present = ar_shape.has("arcache")
+        self.arprot_present = ar_shape.has("arprot")
+        self.arqos_present = ar_shape.has("arqos")
+        self.arregion_present = ar_shape.has("arregion")
+        self.aruser_present = ar_shape.has("aruser")
+        self.ruser_present = r_shape.has("ruser")
 
         super().__init__(2**self.address_width, **kwargs)
 
-        self.log.info("AXI master configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  ID width: %d bits", self.id_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
-        self.log.info("  Max burst size: %d (%d bytes)", self.max_burst_size, 2**self.max_burst_size)
-        self.log.info("  Max burst length: %d cycles (%d bytes)",
+        self._log_config("AXI master configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  ID width: %d bits", self.id_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  Max burst size: %d (%d bytes)", self.max_burst_size, 2**self.max_burst_size)
+        self._log_config("  Max burst length: %d cycles (%d bytes)",
             self.max_burst_len, self.max_burst_len*self.byte_lanes)
 
-        self.log.info("AXI master signals:")
-        for bus in (self.bus.ar, self.bus.r):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI master signals:", (self.bus.ar, self.bus.r))
 
         assert self.byte_lanes * self.byte_size == self.width
 
-        assert len(self.r_channel.bus.rid) == len(self.ar_channel.bus.arid)
+        assert r_shape.width("rid") == ar_shape.width("arid")
 
         self._process_read_cr = None
         self._process_read_resp_cr = None
@@ -26,13 +26,14 @@ import logging
 
 import cocotb
 
-from .version import __version__
 from .constants import AxiBurstType, AxiProt, AxiResp
 from .axi_channels import AxiAWSink, AxiWSink, AxiBSource, AxiARSink, AxiRSource
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 
 
-class AxiSlaveWrite(Reset):
+class AxiSlaveWrite(Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -43,10 +44,7 @@ class AxiSlaveWrite(Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.aw._entity._name}")
 
-        self.log.info("AXI slave model (write)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2021-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI slave model (write)", "Copyright (c) 2021-2025 Alex Forencich")
 
         super().__init__(**kwargs)
 
@@ -57,36 +55,34 @@ class AxiSlaveWrite(Reset):
         self.b_channel = AxiBSource(bus.b, clock, reset, reset_active_level)
         self.b_channel.queue_occupancy_limit = 2
 
-        self.address_width = len(self.aw_channel.bus.awaddr)
-        self.id_width = len(self.aw_channel.bus.awid)
-        self.width = len(self.w_channel.bus.wdata)
+        aw_shape = bus_shape(self.bus.aw)
+        w_shape = bus_shape(self.bus.w)
+        b_shape = bus_shape(self.bus.b)
+
+        self.address_width = aw_shape.width("awaddr")
+        self.id_width = aw_shape.width("awid")
+        self.width = w_shape.width("wdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
 
         self.max_burst_size = (self.byte_lanes-1).bit_length()
 
-        self.wstrb_present = hasattr(self.bus.w, "wstrb")
+        self.wstrb_present = w_shape.has("wstrb")
 
-        self.log.info("AXI slave model configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  ID width: %d bits", self.id_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI slave model configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  ID width: %d bits", self.id_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
 
-        self.log.info("AXI slave model signals:")
-        for bus in (self.bus.aw, self.bus.w, self.bus.b):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI slave model signals:", (self.bus.aw, self.bus.w, self.bus.b))
 
         if self.wstrb_present:
-            assert self.byte_lanes == len(self.w_channel.bus.wstrb)
+            assert self.byte_lanes == w_shape.width("wstrb")
         assert self.byte_lanes * self.byte_size == self.width
 
-        assert len(self.b_channel.bus.bid) == len(self.aw_channel.bus.awid)
+        assert b_shape.width("bid") == aw_shape.width("awid")
 
         self._process_write_cr = None
 
@@ -203,7 +199,7 @@ class AxiSlaveWrite(Reset):
             await self.b_channel.send(b)
 
 
-class AxiSlaveRead(Reset):
+class AxiSlaveRead(Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -214,10 +210,7 @@ class AxiSlaveRead(Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.ar._entity._name}")
 
-        self.log.info("AXI slave model (read)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2021-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI slave model (read)", "Copyright (c) 2021-2025 Alex Forencich")
 
         super().__init__(**kwargs)
 
@@ -226,31 +219,28 @@ class AxiSlaveRead(Reset):
         self.r_channel = AxiRSource(bus.r, clock, reset, reset_active_level)
         self.r_channel.queue_occupancy_limit = 2
 
-        self.address_width = len(self.ar_channel.bus.araddr)
-        self.id_width = len(self.ar_channel.bus.arid)
-        self.width = len(self.r_channel.bus.rdata)
+        ar_shape = bus_shape(self.bus.ar)
+        r_shape = bus_shape(self.bus.r)
+
+        self.address_width = ar_shape.width("araddr")
+        self.id_width = ar_shape.width("arid")
+        self.width = r_shape.width("rdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
 
         self.max_burst_size = (self.byte_lanes-1).bit_length()
 
-        self.log.info("AXI slave model configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  ID width: %d bits", self.id_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
-
-        self.log.info("AXI slave model signals:")
-        for bus in (self.bus.ar, self.bus.r):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._log_config("AXI slave model configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  ID width: %d bits", self.id_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+
+        self._init_signal_report("AXI slave model signals:", (self.bus.ar, self.bus.r))
 
         assert self.byte_lanes * self.byte_size == self.width
 
-        assert len(self.r_channel.bus.rid) == len(self.ar_channel.bus.arid)
+        assert r_shape.width("rid") == ar_shape.width("arid")
 
         self._process_read_cr = None
 
@@ -29,11 +29,12 @@ import cocotb
 from cocotb.queue import Queue
 from cocotb.triggers import Event
 
-from .version import __version__
 from .constants import AxiProt, AxiResp
 from .axil_channels import AxiLiteAWSource, AxiLiteWSource, AxiLiteBSink, AxiLiteARSource, AxiLiteRSink
 from .address_space import Region
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 
 
 # AXI lite master write helper objects
@@ -83,8 +84,8 @@ class AxiLiteReadResp(NamedTuple):
         return self.data
 
 
-class AxiLiteMasterWrite(Region, Reset):
-    def __init__(self, bus, clock, reset=None, reset_active_level=True, **kwargs):
+class AxiLiteMasterWrite(Region, Reset, SignalReport):
+    def __init__(self, bus, clock, reset=None, reset_active_level=True, aw_credits=4, w_credits=4, **kwargs):
         self.bus = bus
         self.clock = clock
         self.reset = reset
@@ -93,10 +94,7 @@ class AxiLiteMasterWrite(Region, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.aw._entity._name}")
 
-        self.log.info("AXI lite master (write)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2020-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI lite master (write)", "Copyright (c) 2020-2025 Alex Forencich")
 
         self.aw_channel = AxiLiteAWSource(bus.aw, clock, reset, reset_active_level)
         self.aw_channel.queue_occupancy_limit = 2
@@ -106,8 +104,19 @@ class AxiLiteMasterWrite(Region, Reset):
         self.b_channel.queue_occupancy_limit = 2
 
         self.write_command_queue = Queue()
-        self.write_command_queue.queue_occupancy_limit = 2
-        self.current_write_command = None
+
+        self.int_write_addr_command_queue = Queue()
+        self.int_write_data_command_queue = Queue()
+
+        # AW and W are issued independently; each may run ahead of the write
+        # responses by up to its own number of credits, one per transfer,
+        # returned when the corresponding write response is received
+        self.aw_credits = max(aw_credits, 1)
+        self.w_credits = max(w_credits, 1)
+        self._aw_outstanding = 0
+        self._w_outstanding = 0
+        self._aw_credit_event = Event()
+        self._w_credit_event = Event()
 
         self.int_write_resp_command_queue = Queue()
         self.current_write_resp_command = None
@@ -116,35 +125,36 @@ class AxiLiteMasterWrite(Region, Reset):
         self._idle = Event()
         self._idle.set()
 
-        self.address_width = len(self.aw_channel.bus.awaddr)
-        self.width = len(self.w_channel.bus.wdata)
+        aw_shape = bus_shape(self.bus.aw)
+        w_shape = bus_shape(self.bus.w)
+
+        self.address_width = aw_shape.width("awaddr")
+        self.width = w_shape.width("wdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
 
-        self.awprot_present = hasattr(self.bus.aw, "awprot")
-        self.wstrb_present = hasattr(self.bus.w, "wstrb")
+        self.awprot_present = aw_shape.has("awprot")
+        self.wstrb_present = w_shape.has("wstrb")
 
         super().__init__(2**self.address_width, **kwargs)
 
-        self.log.info("AXI lite master configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI lite master configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  AW credits: %d", self.aw_credits)
+        self._log_config("  W credits: %d", self.w_credits)
 
-        self.log.info("AXI lite master signals:")
-        for bus in (self.bus.aw, self.bus.w, self.bus.b):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI lite master signals:", (self.bus.aw, self.bus.w, self.bus.b))
 
         if self.wstrb_present:
-            assert self.byte_lanes == len(self.w_channel.bus.wstrb)
+            assert self.byte_lanes == w_shape.width("wstrb")
         assert self.byte_lanes * self.byte_size == self.width
 
         self._process_write_cr = None
+        self._process_write_addr_cr = None
+        self._process_write_data_cr = None
         self._process_write_resp_cr = None
 
         self._init_reset(reset, reset_active_level)
@@ -213,6 +223,12 @@ class AxiLiteMasterWrite(Region, Reset):
             if self._process_write_cr is not None:
                 self._process_write_cr.kill()
                 self._process_write_cr = None
+            if self._process_write_addr_cr is not None:
+                self._process_write_addr_cr.kill()
+                self._process_write_addr_cr = None
+            if self._process_write_data_cr is not None:
+                self._process_write_data_cr.kill()
+                self._process_write_data_cr = None
             if self._process_write_resp_cr is not None:
                 self._process_write_resp_cr.kill()
                 self._process_write_resp_cr = None
@@ -230,10 +246,11 @@ class AxiLiteMasterWrite(Region, Reset):
                 cmd = self.write_command_queue.get_nowait()
                 flush_cmd(cmd)
 
-            if self.current_write_command:
-                cmd = self.current_write_command
-                self.current_write_command = None
-                flush_cmd(cmd)
+            # commands here are also in the response queue, flushed below
+            while not self.int_write_addr_command_queue.empty():
+                self.int_write_addr_command_queue.get_nowait()
+            while not self.int_write_data_command_queue.empty():
+                self.int_write_data_command_queue.get_nowait()
 
             while not self.int_write_resp_command_queue.empty():
                 cmd = self.int_write_resp_command_queue.get_nowait()
@@ -244,21 +261,66 @@ class AxiLiteMasterWrite(Region, Reset):
                 self.current_write_resp_command = None
                 flush_cmd(cmd)
 
+            self._aw_outstanding = 0
+            self._w_outstanding = 0
+            self._aw_credit_event.set()
+            self._w_credit_event.set()
+
             self.in_flight_operations = 0
             self._idle.set()
         else:
             self.log.info("Reset de-asserted")
             if self._process_write_cr is None:
                 self._process_write_cr = cocotb.start_soon(self._process_write())
+            if self._process_write_addr_cr is None:
+                self._process_write_addr_cr = cocotb.start_soon(self._process_write_addr())
+            if self._process_write_data_cr is None:
+                self._process_write_data_cr = cocotb.start_soon(self._process_write_data())
             if self._process_write_resp_cr is None:
                 self._process_write_resp_cr = cocotb.start_soon(self._process_write_resp())
 
     async def _process_write(self):
         while True:
             cmd = await self.write_command_queue.get()
-            self.current_write_command = cmd
+
+            cycles = (len(cmd.data) + (cmd.address % self.byte_lanes) + self.byte_lanes-1) // self.byte_lanes
+
+            if self.log.isEnabledFor(logging.INFO):
+                self.log.info("Write start addr: 0x%08x prot: %s data: %s",
+                        cmd.address, cmd.prot, ' '.join((f'{c:02x}' for c in cmd.data)))
+
+            resp_cmd = AxiLiteWriteRespCmd(cmd.address, len(cmd.data), cycles, cmd.prot, cmd.event)
+            self.int_write_resp_command_queue.put_nowait(resp_cmd)
+
+            # AW and W are issued independently, each limited by its credits
+            self.int_write_addr_command_queue.put_nowait(cmd)
+            self.int_write_data_command_queue.put_nowait(cmd)
+
+    async def _process_write_addr(self):
+        while True:
+            cmd = await self.int_write_addr_command_queue.get()
 
             word_addr = (cmd.address // self.byte_lanes) * self.byte_lanes
+            cycles = (len(cmd.data) + (cmd.address % self.byte_lanes) + self.byte_lanes-1) // self.byte_lanes
+
+            for k in range(cycles):
+                aw = self.aw_channel._transaction_obj()
+                if k == 0:
+                    aw.awaddr = cmd.address
+                else:
+                    aw.awaddr = word_addr + k*self.byte_lanes
+                aw.awprot = cmd.prot
+
+                while self._aw_outstanding >= self.aw_credits:
+                    self._aw_credit_event.clear()
+                    await self._aw_credit_event.wait()
+                self._aw_outstanding += 1
+
+                await self.aw_channel.send(aw)
+
+    async def _process_write_data(self):
+        while True:
+            cmd = await self.int_write_data_command_queue.get()
 
             start_offset = cmd.address % self.byte_lanes
             end_offset = ((cmd.address + len(cmd.data) - 1) % self.byte_lanes) + 1
@@ -266,17 +328,10 @@ class AxiLiteMasterWrite(Region, Reset):
             strb_start = (self.strb_mask << start_offset) & self.strb_mask
             strb_end = self.strb_mask >> (self.byte_lanes - end_offset)
 
-            cycles = (len(cmd.data) + (cmd.address % self.byte_lanes) + self.byte_lanes-1) // self.byte_lanes
-
-            resp_cmd = AxiLiteWriteRespCmd(cmd.address, len(cmd.data), cycles, cmd.prot, cmd.event)
-            await self.int_write_resp_command_queue.put(resp_cmd)
+            cycles = (len(cmd.data) + start_offset + self.byte_lanes-1) // self.byte_lanes
 
             offset = 0
 
-            if self.log.isEnabledFor(logging.INFO):
-                self.log.info("Write start addr: 0x%08x prot: %s data: %s",
-                        cmd.address, cmd.prot, ' '.join((f'{c:02x}' for c in cmd.data)))
-
             for k in range(cycles):
                 start = 0
                 stop = self.byte_lanes
@@ -294,13 +349,6 @@ class AxiLiteMasterWrite(Region, Reset):
                     val |= cmd.data[offset] << j*8
                     offset += 1
 
-                aw = self.aw_channel._transaction_obj()
-                if k == 0:
-                    aw.awaddr = cmd.address
-                else:
-                    aw.awaddr = word_addr + k*self.byte_lanes
-                aw.awprot = cmd.prot
-
                 if not self.wstrb_present and strb != self.strb_mask:
                     self.log.warning("Partial operation requested with wstrb not connected, write will be zero-padded (0x%x != 0x%x)", strb, self.strb_mask)
 
@@ -308,10 +356,12 @@ class AxiLiteMasterWrite(Region, Reset):
                 w.wdata = val
                 w.wstrb = strb
 
-                await self.aw_channel.send(aw)
-                await self.w_channel.send(w)
+                while self._w_outstanding >= self.w_credits:
+                    self._w_credit_event.clear()
+                    await self._w_credit_event.wait()
+                self._w_outstanding += 1
 
-            self.current_write_command = None
+                await self.w_channel.send(w)
 
     async def _process_write_resp(self):
         while True:
@@ -323,6 +373,12 @@ class AxiLiteMasterWrite(Region, Reset):
             for k in range(cmd.cycles):
                 b = await self.b_channel.recv()
 
+                # return AW and W credits
+                self._aw_outstanding -= 1
+                self._w_outstanding -= 1
+                self._aw_credit_event.set()
+                self._w_credit_event.set()
+
                 cycle_resp = AxiResp(int(getattr(b, 'bresp', AxiResp.OKAY)))
 
                 if cycle_resp != AxiResp.OKAY:
@@ -343,7 +399,7 @@ class AxiLiteMasterWrite(Region, Reset):
                 self._idle.set()
 
 
-class AxiLiteMasterRead(Region, Reset):
+class AxiLiteMasterRead(Region, Reset, SignalReport):
     def __init__(self, bus, clock, reset=None, reset_active_level=True, **kwargs):
         self.bus = bus
         self.clock = clock
@@ -353,10 +409,7 @@ class AxiLiteMasterRead(Region, Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.ar._entity._name}")
 
-        self.log.info("AXI lite master (read)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2020-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI lite master (read)", "Copyright (c) 2020-2025 Alex Forencich")
 
         self.ar_channel = AxiLiteARSource(bus.ar, clock, reset, reset_active_level)
         self.ar_channel.queue_occupancy_limit = 2
@@ -374,27 +427,24 @@ class AxiLiteMasterRead(Region, Reset):
         self._idle = Event()
         self._idle.set()
 
-        self.address_width = len(self.ar_channel.bus.araddr)
-        self.width = len(self.r_channel.bus.rdata)
+        ar_shape = bus_shape(self.bus.ar)
+        r_shape = bus_shape(self.bus.r)
+
+        self.address_width = ar_shape.width("araddr")
+        self.width = r_shape.width("rdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
 
-        self.arprot_present = hasattr(self.bus.ar, "arprot")
+        self.arprot_present = ar_shape.has("arprot")
 
         super().__init__(2**self.address_width, **kwargs)
 
-        self.log.info("AXI lite master configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI lite master configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
 
-        self.log.info("AXI lite master signals:")
-        for bus in (self.bus.ar, self.bus.r):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI lite master signals:", (self.bus.ar, self.bus.r))
 
         assert self.byte_lanes * self.byte_size == self.width
 
@@ -580,11 +630,12 @@ class AxiLiteMasterRead(Region, Reset):
 
 
 class AxiLiteMaster(Region):
-    def __init__(self, bus, clock, reset=None, reset_active_level=True, **kwargs):
+    def __init__(self, bus, clock, reset=None, reset_active_level=True, aw_credits=4, w_credits=4, **kwargs):
         self.write_if = None
         self.read_if = None
 
-        self.write_if = AxiLiteMasterWrite(bus.write, clock, reset, reset_active_level, **kwargs)
+        self.write_if = AxiLiteMasterWrite(bus.write, clock, reset, reset_active_level, aw_credits, w_credits,
+            **kwargs)
         self.read_if = AxiLiteMasterRead(bus.read, clock, reset, reset_active_level, **kwargs)
 
         super().__init__(max(self.write_if.size, self.read_if.size), **kwargs)
@@ -26,14 +26,15 @@ import logging
 
 import cocotb
 
-from .version import __version__
 from .constants import AxiProt, AxiResp
 from .axil_channels import AxiLiteAWSink, AxiLiteWSink, AxiLiteBSource, AxiLiteARSink, AxiLiteRSource
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 
 
-class AxiLiteSlaveWrite(Reset):
-    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
+class AxiLiteSlaveWrite(Reset, SignalReport):
+    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, max_outstanding=2, **kwargs):
         self.bus = bus
         self.clock = clock
         self.reset = reset
@@ -43,43 +44,42 @@ class AxiLiteSlaveWrite(Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.aw._entity._name}")
 
-        self.log.info("AXI lite slave model (write)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2021-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI lite slave model (write)", "Copyright (c) 2021-2025 Alex Forencich")
 
         super().__init__(**kwargs)
 
+        self.max_outstanding = max(max_outstanding, 1)
+
+        # AW, W, and B are independent, so up to max_outstanding operations
+        # can be accepted ahead of the corresponding write responses
         self.aw_channel = AxiLiteAWSink(bus.aw, clock, reset, reset_active_level)
-        self.aw_channel.queue_occupancy_limit = 2
+        self.aw_channel.queue_occupancy_limit = self.max_outstanding
         self.w_channel = AxiLiteWSink(bus.w, clock, reset, reset_active_level)
-        self.w_channel.queue_occupancy_limit = 2
+        self.w_channel.queue_occupancy_limit = self.max_outstanding
         self.b_channel = AxiLiteBSource(bus.b, clock, reset, reset_active_level)
-        self.b_channel.queue_occupancy_limit = 2
+        self.b_channel.queue_occupancy_limit = self.max_outstanding
+
+        aw_shape = bus_shape(self.bus.aw)
+        w_shape = bus_shape(self.bus.w)
 
-        self.address_width = len(self.aw_channel.bus.awaddr)
-        self.width = len(self.w_channel.bus.wdata)
+        self.address_width = aw_shape.width("awaddr")
+        self.width = w_shape.width("wdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
         self.strb_mask = 2**self.byte_lanes-1
 
-        self.wstrb_present = hasattr(self.bus.w, "wstrb")
+        self.wstrb_present = w_shape.has("wstrb")
 
-        self.log.info("AXI lite slave model configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI lite slave model configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  Max outstanding: %d", self.max_outstanding)
 
-        self.log.info("AXI lite slave model signals:")
-        for bus in (self.bus.aw, self.bus.w, self.bus.b):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI lite slave model signals:", (self.bus.aw, self.bus.w, self.bus.b))
 
         if self.wstrb_present:
-            assert self.byte_lanes == len(self.w_channel.bus.wstrb)
+            assert self.byte_lanes == w_shape.width("wstrb")
         assert self.byte_lanes * self.byte_size == self.width
 
         self._process_write_cr = None
@@ -158,8 +158,8 @@ class AxiLiteSlaveWrite(Reset):
             await self.b_channel.send(b)
 
 
-class AxiLiteSlaveRead(Reset):
-    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
+class AxiLiteSlaveRead(Reset, SignalReport):
+    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, max_outstanding=2, **kwargs):
         self.bus = bus
         self.clock = clock
         self.reset = reset
@@ -169,35 +169,32 @@ class AxiLiteSlaveRead(Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus.ar._entity._name}")
 
-        self.log.info("AXI lite slave model (read)")
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2021-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, "AXI lite slave model (read)", "Copyright (c) 2021-2025 Alex Forencich")
 
         super().__init__(**kwargs)
 
+        self.max_outstanding = max(max_outstanding, 1)
+
         self.ar_channel = AxiLiteARSink(bus.ar, clock, reset, reset_active_level)
-        self.ar_channel.queue_occupancy_limit = 2
+        self.ar_channel.queue_occupancy_limit = self.max_outstanding
         self.r_channel = AxiLiteRSource(bus.r, clock, reset, reset_active_level)
-        self.r_channel.queue_occupancy_limit = 2
+        self.r_channel.queue_occupancy_limit = self.max_outstanding
+
+        ar_shape = bus_shape(self.bus.ar)
+        r_shape = bus_shape(self.bus.r)
 
-        self.address_width = len(self.ar_channel.bus.araddr)
-        self.width = len(self.r_channel.bus.rdata)
+        self.address_width = ar_shape.width("araddr")
+        self.width = r_shape.width("rdata")
         self.byte_size = 8
         self.byte_lanes = self.width // self.byte_size
 
-        self.log.info("AXI lite slave model configuration:")
-        self.log.info("  Address width: %d bits", self.address_width)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI lite slave model configuration:")
+        self._log_config("  Address width: %d bits", self.address_width)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("  Max outstanding: %d", self.max_outstanding)
 
-        self.log.info("AXI lite slave model signals:")
-        for bus in (self.bus.ar, self.bus.r):
-            for sig in sorted(list(set().union(bus._signals, bus._optional_signals))):
-                if hasattr(bus, sig):
-                    self.log.info("  %s width: %d bits", sig, len(getattr(bus, sig)))
-                else:
-                    self.log.info("  %s: not present", sig)
+        self._init_signal_report("AXI lite slave model signals:", (self.bus.ar, self.bus.r))
 
         assert self.byte_lanes * self.byte_size == self.width
 
@@ -249,11 +246,11 @@ class AxiLiteSlaveRead(Reset):
 
 
 class AxiLiteSlave:
-    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, **kwargs):
+    def __init__(self, bus, clock, reset=None, target=None, reset_active_level=True, max_outstanding=2, **kwargs):
         self.write_if = None
         self.read_if = None
 
         super().__init__(**kwargs)
 
-        self.write_if = AxiLiteSlaveWrite(bus.write, clock, reset, target, reset_active_level)
-        self.read_if = AxiLiteSlaveRead(bus.read, clock, reset, target, reset_active_level)
+        self.write_if = AxiLiteSlaveWrite(bus.write, clock, reset, target, reset_active_level, max_outstanding)
+        self.read_if = AxiLiteSlaveRead(bus.read, clock, reset, target, reset_active_level, max_outstanding)
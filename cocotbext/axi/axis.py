@@ -35,8 +35,9 @@ try:
 except ImportError:
     pass
 
-from .version import __version__
 from .reset import Reset
+from .banner import log_banner, SignalReport
+from .bus_shape import bus_shape
 
 
 class AxiStreamFrame:
@@ -253,7 +254,7 @@ class AxiStreamBus(Bus):
         return cls(entity, prefix, **kwargs)
 
 
-class AxiStreamBase(Reset):
+class AxiStreamBase(Reset, SignalReport):
 
     _signals = ["tdata"]
     _optional_signals = ["tvalid", "tready", "tlast", "tkeep", "tid", "tdest", "tuser"]
@@ -276,10 +277,7 @@ class AxiStreamBase(Reset):
         else:
             self.log = logging.getLogger(f"cocotb.{bus._entity._name}")
 
-        self.log.info("AXI stream %s", self._type)
-        self.log.info("cocotbext-axi version %s", __version__)
-        self.log.info("Copyright (c) 2020-2025 Alex Forencich")
-        self.log.info("https://github.com/alexforencich/cocotbext-axi")
+        log_banner(self.log, f"AXI stream {self._type}", "Copyright (c) 2020-2025 Alex Forencich")
 
         super().__init__(*args, **kwargs)
 
@@ -295,17 +293,19 @@ class AxiStreamBase(Reset):
         self.queue_occupancy_bytes = 0
         self.queue_occupancy_frames = 0
 
-        self.width = len(self.bus.tdata)
+        shape = bus_shape(self.bus)
+
+        self.width = shape.width("tdata")
         self.byte_lanes = self.width // 8
 
-        if self._valid_init is not None and hasattr(self.bus, "tvalid"):
+        if self._valid_init is not None and shape.has("tvalid"):
             self.bus.tvalid.setimmediatevalue(self._valid_init)
-        if self._ready_init is not None and hasattr(self.bus, "tready"):
+        if self._ready_init is not None and shape.has("tready"):
             self.bus.tready.setimmediatevalue(self._ready_init)
 
-        for sig in self._signals+self._optional_signals:
-            if hasattr(self.bus, sig):
-                if self._init_x and sig not in ("tvalid", "tready"):
+        if self._init_x:
+            for sig in self._signals+self._optional_signals:
+                if shape.has(sig) and sig not in ("tvalid", "tready"):
                     s = getattr(self.bus, sig)
                     try:
                         v = LogicArray("x"*len(s.value))
@@ -314,8 +314,8 @@ class AxiStreamBase(Reset):
                         v.binstr = 'x'*len(v)
                     s.setimmediatevalue(v)
 
-        if hasattr(self.bus, "tkeep"):
-            self.byte_lanes = len(self.bus.tkeep)
+        if shape.has("tkeep"):
+            self.byte_lanes = shape.width("tkeep")
             if byte_size is not None or byte_lanes is not None:
                 raise ValueError("Cannot specify byte_size or byte_lanes if tkeep is connected")
         else:
@@ -329,16 +329,11 @@ class AxiStreamBase(Reset):
         self.byte_size = self.width // self.byte_lanes
         self.byte_mask = 2**self.byte_size-1
 
-        self.log.info("AXI stream %s configuration:", self._type)
-        self.log.info("  Byte size: %d bits", self.byte_size)
-        self.log.info("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
+        self._log_config("AXI stream %s configuration:", self._type)
+        self._log_config("  Byte size: %d bits", self.byte_size)
+        self._log_config("  Data width: %d bits (%d bytes)", self.width, self.byte_lanes)
 
-        self.log.info("AXI stream %s signals:", self._type)
-        for sig in sorted(list(set().union(self.bus._signals, self.bus._optional_signals))):
-            if hasattr(self.bus, sig):
-                self.log.info("  %s width: %d bits", sig, len(getattr(self.bus, sig)))
-            else:
-                self.log.info("  %s: not present", sig)
+        self._init_signal_report(f"AXI stream {self._type} signals:", (self.bus,))
 
         if self.byte_lanes * self.byte_size != self.width:
             raise ValueError(f"Bus does not evenly divide into byte lanes "
@@ -489,18 +484,19 @@ class AxiStreamSource(AxiStreamBase, AxiStreamPause):
         super()._handle_reset(state)
 
         if state:
+            shape = bus_shape(self.bus)
             self.bus.tdata.value = 0
-            if hasattr(self.bus, "tvalid"):
+            if shape.has("tvalid"):
                 self.bus.tvalid.value = 0
-            if hasattr(self.bus, "tlast"):
+            if shape.has("tlast"):
                 self.bus.tlast.value = 0
-            if hasattr(self.bus, "tkeep"):
+            if shape.has("tkeep"):
                 self.bus.tkeep.value = 0
-            if hasattr(self.bus, "tid"):
+            if shape.has("tid"):
                 self.bus.tid.value = 0
-            if hasattr(self.bus, "tdest"):
+            if shape.has("tdest"):
                 self.bus.tdest.value = 0
-            if hasattr(self.bus, "tuser"):
+            if shape.has("tuser"):
                 self.bus.tuser.value = 0
 
             if self.current_frame:
@@ -513,13 +509,14 @@ class AxiStreamSource(AxiStreamBase, AxiStreamPause):
         frame_offset = 0
         self.active = False
 
-        has_tready = hasattr(self.bus, "tready")
-        has_tvalid = hasattr(self.bus, "tvalid")
-        has_tlast = hasattr(self.bus, "tlast")
-        has_tkeep = hasattr(self.bus, "tkeep")
-        has_tid = hasattr(self.bus, "tid")
-        has_tdest = hasattr(self.bus, "tdest")
-        has_tuser = hasattr(self.bus, "tuser")
+        shape = bus_shape(self.bus)
+        has_tready = shape.has("tready")
+        has_tvalid = shape.has("tvalid")
+        has_tlast = shape.has("tlast")
+        has_tkeep = shape.has("tkeep")
+        has_tid = shape.has("tid")
+        has_tdest = shape.has("tdest")
+        has_tuser = shape.has("tuser")
 
         clock_edge_event = RisingEdge(self.clock)
 
@@ -610,9 +607,9 @@ class AxiStreamMonitor(AxiStreamBase):
 
         self.read_queue = []
 
-        if hasattr(self.bus, "tvalid"):
+        if bus_shape(self.bus).has("tvalid"):
             cocotb.start_soon(self._run_tvalid_monitor())
-        if hasattr(self.bus, "tready"):
+        if bus_shape(self.bus).has("tready"):
             cocotb.start_soon(self._run_tready_monitor())
 
     def _dequeue(self, frame):
@@ -681,13 +678,14 @@ class AxiStreamMonitor(AxiStreamBase):
         frame = None
         self.active = False
 
-        has_tready = hasattr(self.bus, "tready")
-        has_tvalid = hasattr(self.bus, "tvalid")
-        has_tlast = hasattr(self.bus, "tlast")
-        has_tkeep = hasattr(self.bus, "tkeep")
-        has_tid = hasattr(self.bus, "tid")
-        has_tdest = hasattr(self.bus, "tdest")
-        has_tuser = hasattr(self.bus, "tuser")
+        shape = bus_shape(self.bus)
+        has_tready = shape.has("tready")
+        has_tvalid = shape.has("tvalid")
+        has_tlast = shape.has("tlast")
+        has_tkeep = shape.has("tkeep")
+        has_tid = shape.has("tid")
+        has_tdest = shape.has("tdest")
+        has_tuser = shape.has("tuser")
 
         clock_edge_event = RisingEdge(self.clock)
 
@@ -767,7 +765,7 @@ class AxiStreamSink(AxiStreamMonitor, AxiStreamPause):
         super()._handle_reset(state)
 
         if state:
-            if hasattr(self.bus, "tready"):
+            if bus_shape(self.bus).has("tready"):
                 self.bus.tready.value = 0
 
     def _pause_update(self, val):
@@ -780,13 +778,14 @@ class AxiStreamSink(AxiStreamMonitor, AxiStreamPause):
         frame = None
         self.active = False
 
-        has_tready = hasattr(self.bus, "tready")
-        has_tvalid = hasattr(self.bus, "tvalid")
-        has_tlast = hasattr(self.bus, "tlast")
-        has_tkeep = hasattr(self.bus, "tkeep")
-        has_tid = hasattr(self.bus, "tid")
-        has_tdest = hasattr(self.bus, "tdest")
-        has_tuser = hasattr(self.bus, "tuser")
+        shape = bus_shape(self.bus)
+        has_tready = shape.has("tready")
+        has_tvalid = shape.has("tvalid")
+        has_tlast = shape.has("tlast")
+        has_tkeep = shape.has("tkeep")
+        has_tid = shape.has("tid")
+        has_tdest = shape.has("tdest")
+        has_tuser = shape.has("tuser")
 
         clock_edge_event = RisingEdge(self.clock)
 
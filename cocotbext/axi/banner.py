@@ -0,0 +1,83 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+from .version import __version__
+from .bus_shape import bus_shape
+
+# In quiet mode, the version banner is only logged once per process and the
+# per-instance configuration and signal report are only logged when
+# log_signals() is called
+quiet = False
+_banner_logged = False
+
+
+def set_quiet(enable=True):
+    global quiet
+    quiet = bool(enable)
+
+
+def log_banner(log, name, copyright="Copyright (c) 2020-2025 Alex Forencich"):
+    global _banner_logged
+
+    if quiet:
+        log.debug(name)
+        if _banner_logged:
+            return
+    else:
+        log.info(name)
+
+    _banner_logged = True
+
+    log.info("cocotbext-axi version %s", __version__)
+    log.info(copyright)
+    log.info("https://github.com/alexforencich/cocotbext-axi")
+
+
+class SignalReport:
+    def _log_config(self, msg, *args):
+        try:
+            config = self._config_report
+        except AttributeError:
+            config = self._config_report = []
+        config.append((msg, args))
+
+        if not quiet:
+            self.log.info(msg, *args)
+
+    def _init_signal_report(self, title, buses):
+        self._signal_report_title = title
+        self._signal_report_buses = buses
+
+        if not quiet:
+            # configuration was logged as it was recorded
+            self.log_signals(config=False)
+
+    def log_signals(self, config=True):
+        if config:
+            for msg, args in getattr(self, '_config_report', ()):
+                self.log.info(msg, *args)
+        self.log.info(self._signal_report_title)
+        for bus in self._signal_report_buses:
+            for msg, args in bus_shape(bus).report:
+                self.log.info(msg, *args)
@@ -22,16 +22,44 @@ THE SOFTWARE.
 
 """
 
+import heapq
+
 
 class BuddyAllocator:
     def __init__(self, size, min_alloc=1):
         self.size = size
         self.min_alloc = min_alloc
 
-        self.free_lists = [[] for x in range((self.size-1).bit_length())]
-        self.free_lists.append([0])
+        self.free_lists = [set() for x in range((self.size-1).bit_length())]
+        self.free_lists.append({0})
+        self.free_heaps = [[] for x in self.free_lists]
+        self.free_heaps[-1].append(0)
         self.allocations = {}
 
+        self.allocated = 0
+        self.peak_allocated = 0
+        self.alloc_count = 0
+        self.free_count = 0
+
+    def _push_free(self, bucket, block):
+        self.free_lists[bucket].add(block)
+        heap = self.free_heaps[bucket]
+        heapq.heappush(heap, block)
+        if len(heap) > 2*len(self.free_lists[bucket])+16:
+            # drop stale entries left behind by merges
+            heap[:] = self.free_lists[bucket]
+            heapq.heapify(heap)
+
+    def _pop_free(self, bucket):
+        # lowest free address first; entries no longer in the free set are stale
+        free_list = self.free_lists[bucket]
+        heap = self.free_heaps[bucket]
+        while True:
+            block = heapq.heappop(heap)
+            if block in free_list:
+                free_list.remove(block)
+                return block
+
     def alloc(self, size):
         if size < 1 or size > self.size:
             raise ValueError("size out of range")
@@ -47,20 +75,19 @@ class BuddyAllocator:
                 bucket += 1
                 continue
 
+            block = self._pop_free(bucket)
+
             while bucket > orig_bucket:
-                # split block
-                block = self.free_lists[bucket].pop(0)
+                # split block, keep lower half
                 bucket -= 1
-                self.free_lists[bucket].append(block)
-                self.free_lists[bucket].append(block+2**bucket)
-
-            if self.free_lists[bucket]:
-                # allocate
-                block = self.free_lists[bucket].pop(0)
-                self.allocations[block] = bucket
-                return block
+                self._push_free(bucket, block+2**bucket)
 
-            break
+            # allocate
+            self.allocations[block] = bucket
+            self.allocated += 2**bucket
+            self.peak_allocated = max(self.peak_allocated, self.allocated)
+            self.alloc_count += 1
+            return block
 
         raise Exception("out of memory")
 
@@ -69,15 +96,14 @@ class BuddyAllocator:
             raise ValueError("unknown allocation")
 
         bucket = self.allocations.pop(addr)
+        self.allocated -= 2**bucket
+        self.free_count += 1
 
         while bucket < len(self.free_lists):
             size = 2**bucket
 
             # find buddy
-            if (addr // size) % 2:
-                buddy = addr - size
-            else:
-                buddy = addr + size
+            buddy = addr ^ size
 
             if buddy in self.free_lists[bucket]:
                 # buddy is free, merge
@@ -86,7 +112,22 @@ class BuddyAllocator:
                 bucket += 1
             else:
                 # buddy is not free, so add to free list
-                self.free_lists[bucket].append(addr)
+                self._push_free(bucket, addr)
                 return
 
         raise Exception("failed to free memory")
+
+    def free_size(self):
+        return sum(len(lst) << k for k, lst in enumerate(self.free_lists))
+
+    def largest_free_block(self):
+        for k in reversed(range(len(self.free_lists))):
+            if self.free_lists[k]:
+                return 2**k
+        return 0
+
+    def fragmentation(self):
+        free = self.free_size()
+        if not free:
+            return 0.0
+        return 1.0 - self.largest_free_block() / free
@@ -0,0 +1,68 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+class BumpAllocator:
+    def __init__(self, size, align=64):
+        self.size = size
+        self.align = align
+
+        self.ptr = 0
+        self.allocations = {}
+
+        self.allocated = 0
+        self.peak_allocated = 0
+
+    def alloc(self, size):
+        if size < 1 or size > self.size:
+            raise ValueError("size out of range")
+
+        addr = -(-self.ptr // self.align) * self.align
+
+        if addr+size > self.size:
+            raise Exception("out of memory")
+
+        self.ptr = addr+size
+        self.allocations[addr] = size
+        self.allocated += size
+        self.peak_allocated = max(self.peak_allocated, self.allocated)
+        return addr
+
+    def free(self, addr):
+        if addr not in self.allocations:
+            raise ValueError("unknown allocation")
+
+        size = self.allocations.pop(addr)
+        self.allocated -= size
+
+        if addr+size == self.ptr:
+            # most recent allocation, roll back
+            self.ptr = addr
+        if not self.allocations:
+            self.ptr = 0
+
+    def reset(self):
+        self.ptr = 0
+        self.allocations.clear()
+        self.allocated = 0
@@ -0,0 +1,70 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+
+class BusShape:
+    # Signals present on a bus and their widths, shared by all buses of the
+    # same type with the same signature
+    _cache = {}
+
+    def __init__(self, bus_type, widths, optional_signals=()):
+        self.bus_type = bus_type
+        self.widths = dict(widths)
+
+        # signal report, see SignalReport
+        self.report = []
+        for sig in sorted(set(self.widths).union(optional_signals)):
+            if sig in self.widths:
+                self.report.append(("  %s width: %d bits", (sig, self.widths[sig])))
+            else:
+                self.report.append(("  %s: not present", (sig,)))
+
+        # classes that have already checked their constraints against this shape
+        self.checked = set()
+
+    def has(self, sig):
+        return sig in self.widths
+
+    def width(self, sig):
+        return self.widths[sig]
+
+
+def bus_shape(bus):
+    try:
+        return bus._bus_shape
+    except AttributeError:
+        pass
+
+    # handles cache their length, so building the key is cheap
+    widths = tuple((sig, len(handle)) for sig, handle in bus._signals.items())
+    optional_signals = tuple(getattr(bus, '_optional_signals', ()))
+    key = (type(bus), widths, optional_signals)
+
+    shape = BusShape._cache.get(key)
+    if shape is None:
+        shape = BusShape(type(bus), widths, optional_signals)
+        BusShape._cache[key] = shape
+
+    bus._bus_shape = shape
+    return shape
@@ -22,8 +22,13 @@ THE SOFTWARE.
 
 """
 
+import mmap
+
+from .memory_image import iter_image
 from .sparse_memory import SparseMemory
-from .utils import hexdump, hexdump_lines, hexdump_str
+from .watchpoint import Watchpoints
+from .utils import hexdump, hexdump_lines, hexdump_str, fill_pattern
+from .utils import pack_words, unpack_words, words_to_array, words_to_ndarray
 
 
 class Memory:
@@ -33,20 +38,71 @@ class Memory:
         else:
             self.mem = SparseMemory(size)
         self.size = len(self.mem)
+        self._watchpoints = None
         super().__init__(**kwargs)
 
     def read(self, address, length):
-        return self.mem[address:address+length]
+        data = self.mem[address:address+length]
+        wp = self._watchpoints
+        if wp is not None and address < wp.hi and address+length > wp.lo:
+            wp.check('r', address, data)
+        return data
 
     def write(self, address, data):
+        wp = self._watchpoints
+        if wp is not None and address < wp.hi and address+len(data) > wp.lo:
+            wp.check('w', address, data)
         self.mem[address:address+len(data)] = data
 
+    @property
+    def watchpoints(self):
+        if isinstance(self.mem, SparseMemory):
+            return self.mem.watchpoints
+        return self._watchpoints
+
+    def watch(self, address, length, callback=None, read=False, write=True):
+        if isinstance(self.mem, SparseMemory):
+            return self.mem.watch(address, length, callback, read, write)
+        if self._watchpoints is None:
+            self._watchpoints = Watchpoints()
+        return self._watchpoints.add(address, length, callback, read, write)
+
+    def unwatch(self, handle):
+        if isinstance(self.mem, SparseMemory):
+            self.mem.unwatch(handle)
+        elif self._watchpoints is None:
+            raise ValueError("unknown watchpoint")
+        else:
+            self._watchpoints.remove(handle)
+
+    def fill(self, address, length, pattern=b'\x00'):
+        if isinstance(self.mem, SparseMemory):
+            self.mem.fill(address, length, pattern)
+            return
+        offset = 0
+        while offset < length:
+            block_len = min(65536, length-offset)
+            self.write(address+offset, fill_pattern(pattern, block_len, offset))
+            offset += block_len
+
+    def copy(self, dst, src, length):
+        if isinstance(self.mem, SparseMemory):
+            self.mem.copy(dst, src, length)
+        elif isinstance(self.mem, mmap.mmap):
+            wp = self._watchpoints
+            if wp is not None and (dst < wp.hi and dst+length > wp.lo or src < wp.hi and src+length > wp.lo):
+                self.write(dst, self.read(src, length))
+            else:
+                self.mem.move(dst, src, length)
+        else:
+            self.write(dst, self.read(src, length))
+
+    def load_image(self, path, fmt=None, base=0):
+        for address, data in iter_image(path, fmt, base):
+            self.write(address, data)
+
     def write_words(self, address, data, byteorder='little', ws=2):
-        words = data
-        data = bytearray()
-        for w in words:
-            data.extend(w.to_bytes(ws, byteorder))
-        self.write(address, data)
+        self.write(address, pack_words(data, ws, byteorder))
 
     def write_dwords(self, address, data, byteorder='little'):
         self.write_words(address, data, byteorder, 4)
@@ -67,11 +123,13 @@ class Memory:
         self.write_qwords(address, [data], byteorder)
 
     def read_words(self, address, count, byteorder='little', ws=2):
-        data = self.read(address, count*ws)
-        words = []
-        for k in range(count):
-            words.append(int.from_bytes(data[ws*k:ws*(k+1)], byteorder))
-        return words
+        return unpack_words(self.read(address, count*ws), ws, byteorder)
+
+    def read_words_array(self, address, count, byteorder='little', ws=2):
+        return words_to_array(self.read(address, count*ws), ws, byteorder)
+
+    def read_words_ndarray(self, address, count, byteorder='little', ws=2):
+        return words_to_ndarray(self.read(address, count*ws), ws, byteorder)
 
     def read_dwords(self, address, count, byteorder='little'):
         return self.read_words(address, count, byteorder, 4)
@@ -0,0 +1,190 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import os
+import struct
+
+
+def _coalesce(records, chunk_size):
+    # merge contiguous records into chunks of at most chunk_size bytes
+    addr = None
+    buf = bytearray()
+    for a, data in records:
+        if buf and (a != addr+len(buf) or len(buf)+len(data) > chunk_size):
+            yield addr, bytes(buf)
+            buf = bytearray()
+        if not buf:
+            addr = a
+        buf.extend(data)
+    if buf:
+        yield addr, bytes(buf)
+
+
+def iter_bin(path, base=0, chunk_size=65536):
+    with open(path, 'rb') as f:
+        addr = base
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield addr, data
+            addr += len(data)
+
+
+def _iter_ihex_records(path, base):
+    offset = 0
+    with open(path, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if line[0] != ':':
+                raise ValueError(f"invalid Intel HEX record on line {line_num}")
+            rec = bytes.fromhex(line[1:])
+            if len(rec) < 5 or len(rec) != rec[0]+5:
+                raise ValueError(f"invalid Intel HEX record length on line {line_num}")
+            if sum(rec) & 0xff:
+                raise ValueError(f"Intel HEX checksum error on line {line_num}")
+            count = rec[0]
+            addr = (rec[1] << 8) | rec[2]
+            rtype = rec[3]
+            data = rec[4:4+count]
+            if rtype == 0x00:
+                yield base+offset+addr, data
+            elif rtype == 0x01:
+                break
+            elif rtype == 0x02:
+                offset = int.from_bytes(data, 'big') << 4
+            elif rtype == 0x04:
+                offset = int.from_bytes(data, 'big') << 16
+
+
+def iter_ihex(path, base=0, chunk_size=65536):
+    return _coalesce(_iter_ihex_records(path, base), chunk_size)
+
+
+def _iter_srec_records(path, base):
+    addr_len = {'1': 2, '2': 3, '3': 4}
+    with open(path, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) < 4 or line[0] != 'S':
+                raise ValueError(f"invalid SREC record on line {line_num}")
+            rtype = line[1]
+            rec = bytes.fromhex(line[2:])
+            if len(rec) != rec[0]+1:
+                raise ValueError(f"invalid SREC record length on line {line_num}")
+            if (sum(rec) & 0xff) != 0xff:
+                raise ValueError(f"SREC checksum error on line {line_num}")
+            if rtype in addr_len:
+                n = addr_len[rtype]
+                yield base+int.from_bytes(rec[1:1+n], 'big'), rec[1+n:-1]
+            elif rtype in '789':
+                break
+
+
+def iter_srec(path, base=0, chunk_size=65536):
+    return _coalesce(_iter_srec_records(path, base), chunk_size)
+
+
+def iter_elf(path, base=0, chunk_size=65536):
+    with open(path, 'rb') as f:
+        ident = f.read(16)
+        if ident[0:4] != b'\x7fELF':
+            raise ValueError("not an ELF file")
+        if ident[4] == 1:
+            hdr_fmt, ph_fmt = 'HHIIIIIHHHHHH', 'IIIIIIII'
+        elif ident[4] == 2:
+            hdr_fmt, ph_fmt = 'HHIQQQIHHHHHH', 'IIQQQQQQ'
+        else:
+            raise ValueError("invalid ELF class")
+        endian = '<' if ident[5] == 1 else '>'
+
+        hdr_fmt = endian+hdr_fmt
+        hdr = struct.unpack(hdr_fmt, f.read(struct.calcsize(hdr_fmt)))
+        e_phoff, e_phentsize, e_phnum = hdr[4], hdr[8], hdr[9]
+
+        phdrs = []
+        for k in range(e_phnum):
+            f.seek(e_phoff+k*e_phentsize)
+            ph = struct.unpack(endian+ph_fmt, f.read(struct.calcsize(ph_fmt)))
+            if ident[4] == 1:
+                p_type, p_offset, _, p_paddr, p_filesz, p_memsz = ph[0:6]
+            else:
+                p_type, p_offset, p_paddr, p_filesz, p_memsz = ph[0], ph[2], ph[4], ph[5], ph[6]
+            if p_type == 1:
+                # PT_LOAD
+                phdrs.append((p_paddr, p_offset, p_filesz, p_memsz))
+
+        for p_paddr, p_offset, p_filesz, p_memsz in phdrs:
+            f.seek(p_offset)
+            offset = 0
+            while offset < p_filesz:
+                data = f.read(min(chunk_size, p_filesz-offset))
+                if not data:
+                    raise ValueError("truncated ELF segment")
+                yield base+p_paddr+offset, data
+                offset += len(data)
+            # zero-initialized portion
+            while offset < p_memsz:
+                length = min(chunk_size, p_memsz-offset)
+                yield base+p_paddr+offset, bytes(length)
+                offset += length
+
+
+_loaders = {
+    'bin': iter_bin,
+    'ihex': iter_ihex,
+    'srec': iter_srec,
+    'elf': iter_elf,
+}
+
+
+def detect_format(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in ('.hex', '.ihex', '.ihx'):
+        return 'ihex'
+    if ext in ('.srec', '.s19', '.s28', '.s37', '.mot'):
+        return 'srec'
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic == b'\x7fELF':
+        return 'elf'
+    if magic[0:1] == b':' and ext != '.bin':
+        return 'ihex'
+    if magic[0:1] == b'S' and magic[1:2].isdigit() and ext != '.bin':
+        return 'srec'
+    return 'bin'
+
+
+def iter_image(path, fmt=None, base=0, chunk_size=65536):
+    if fmt is None:
+        fmt = detect_format(path)
+    try:
+        loader = _loaders[fmt]
+    except KeyError:
+        raise ValueError(f"unknown image format: {fmt}")
+    return loader(path, base, chunk_size)
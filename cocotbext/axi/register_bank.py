@@ -0,0 +1,227 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import inspect
+
+from .address_space import PeripheralRegion
+
+
+class RegisterField:
+    # access modes:
+    #   rw: read/write
+    #   ro: read only, writes ignored
+    #   wo: write only, reads return zero
+    #   w1c: read, write 1 to clear
+    #   rc: read, cleared on read
+    access_modes = ('rw', 'ro', 'wo', 'w1c', 'rc')
+
+    def __init__(self, name, offset, width=1, access='rw', reset=0):
+        if access not in self.access_modes:
+            raise ValueError(f"invalid access mode: {access}")
+        if offset < 0 or width < 1:
+            raise ValueError("invalid field position")
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.access = access
+        self.reset = reset
+        self.mask = (2**width-1) << offset
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(name={self.name!r}, offset={self.offset}, "
+            f"width={self.width}, access={self.access!r}, reset={self.reset:#x})")
+
+
+class Register:
+    def __init__(self, name, offset, width=32, reset=None, read_mask=None, write_mask=None,
+            fields=None, on_read=None, on_write=None):
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.value_mask = 2**width-1
+
+        self.fields = {}
+        for field in fields or []:
+            if field.mask & ~self.value_mask:
+                raise ValueError(f"field {field.name} does not fit in register {name}")
+            if any(field.mask & f.mask for f in self.fields.values()):
+                raise ValueError(f"field {field.name} overlaps another field in register {name}")
+            self.fields[field.name] = field
+
+        # masks derived from field access modes; bits not covered by a field are read/write
+        mask = {mode: 0 for mode in RegisterField.access_modes}
+        for field in self.fields.values():
+            mask[field.access] |= field.mask
+        free = self.value_mask & ~sum(mask.values())
+
+        if reset is None:
+            reset = 0
+            for field in self.fields.values():
+                reset |= (field.reset << field.offset) & field.mask
+
+        if read_mask is None:
+            read_mask = self.value_mask & ~mask['wo']
+        if write_mask is None:
+            write_mask = free | mask['rw'] | mask['wo']
+
+        self.reset_value = reset & self.value_mask
+        self.read_mask = read_mask & self.value_mask
+        self.write_mask = write_mask & self.value_mask
+        self.w1c_mask = mask['w1c']
+        self.rc_mask = mask['rc']
+
+        self.value = self.reset_value
+
+        self.on_read = on_read
+        self.on_write = on_write
+
+    @property
+    def on_read(self):
+        return self._on_read
+
+    @on_read.setter
+    def on_read(self, callback):
+        self._on_read = callback
+        self._on_read_async = inspect.iscoroutinefunction(callback)
+
+    @property
+    def on_write(self):
+        return self._on_write
+
+    @on_write.setter
+    def on_write(self, callback):
+        self._on_write = callback
+        self._on_write_async = inspect.iscoroutinefunction(callback)
+
+    def reset(self):
+        self.value = self.reset_value
+
+    def get_field(self, name):
+        field = self.fields[name]
+        return (self.value & field.mask) >> field.offset
+
+    def set_field(self, name, value):
+        field = self.fields[name]
+        self.value = (self.value & ~field.mask) | ((value << field.offset) & field.mask)
+
+    def __getitem__(self, name):
+        return self.get_field(name)
+
+    def __setitem__(self, name, value):
+        self.set_field(name, value)
+
+    async def bus_read(self):
+        value = self.value
+        if self._on_read is not None:
+            ret = self._on_read(self)
+            if self._on_read_async:
+                ret = await ret
+            if ret is not None:
+                value = ret
+        if self.rc_mask:
+            self.value &= ~self.rc_mask
+        return value & self.read_mask
+
+    async def bus_write(self, value, mask=None):
+        if mask is None:
+            mask = self.value_mask
+        value &= mask
+        write_mask = self.write_mask & mask
+        new = (self.value & ~write_mask) | (value & write_mask)
+        new &= ~(value & self.w1c_mask)
+        self.value = new & self.value_mask
+        if self._on_write is not None:
+            ret = self._on_write(self, value)
+            if self._on_write_async:
+                await ret
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(name={self.name!r}, offset={self.offset:#x}, "
+            f"width={self.width}, value={self.value:#x})")
+
+
+class RegisterBank(PeripheralRegion):
+    def __init__(self, size, width=32, **kwargs):
+        super().__init__(None, size, **kwargs)
+        if width % 8:
+            raise ValueError("register width must be a multiple of 8 bits")
+        self.width = width
+        self.byte_lanes = width // 8
+        self.registers = {}
+        # register offset to register, for dispatch of bus accesses
+        self._table = {}
+
+    def add_register(self, name, offset, **kwargs):
+        if name in self.registers:
+            raise ValueError(f"duplicate register name: {name}")
+        if offset < 0 or offset+self.byte_lanes > self.size:
+            raise ValueError("register offset out of range")
+        if offset % self.byte_lanes:
+            raise ValueError("register offset not aligned")
+        if offset in self._table:
+            raise ValueError(f"register offset {offset:#x} already in use by {self._table[offset].name}")
+        reg = Register(name, offset, width=self.width, **kwargs)
+        self.registers[name] = reg
+        self._table[offset] = reg
+        return reg
+
+    def remove_register(self, name):
+        reg = self.registers.pop(name)
+        del self._table[reg.offset]
+
+    def reset(self):
+        for reg in self.registers.values():
+            reg.reset()
+
+    def __getitem__(self, name):
+        return self.registers[name]
+
+    async def _read(self, address, length, **kwargs):
+        lanes = self.byte_lanes
+        start = address - address % lanes
+        data = bytearray()
+
+        for offset in range(start, address+length, lanes):
+            reg = self._table.get(offset)
+            if reg is None:
+                data.extend(bytes(lanes))
+            else:
+                data.extend((await reg.bus_read()).to_bytes(lanes, 'little'))
+
+        start = address - start
+        return bytes(data[start:start+length])
+
+    async def _write(self, address, data, **kwargs):
+        lanes = self.byte_lanes
+        end = address+len(data)
+
+        for offset in range(address - address % lanes, end, lanes):
+            reg = self._table.get(offset)
+            if reg is None:
+                continue
+            lo = max(address, offset) - offset
+            hi = min(end, offset+lanes) - offset
+            value = int.from_bytes(data[offset+lo-address:offset+hi-address], 'little') << lo*8
+            mask = (2**((hi-lo)*8)-1) << lo*8
+            await reg.bus_write(value, mask)
@@ -26,6 +26,46 @@ import cocotb
 from cocotb.triggers import Edge
 
 
+class ResetMonitor:
+    # watches one reset signal with a single coroutine and fans changes out
+    # to all subscribed Reset objects
+    _monitors = {}
+
+    def __init__(self, signal):
+        self.signal = signal
+        self.subscribers = []
+        self._run_cr = cocotb.start_soon(self._run())
+
+    @classmethod
+    def get(cls, signal):
+        monitor = cls._monitors.get(signal)
+        if monitor is None or monitor._run_cr.done():
+            # coroutines are killed at the end of each test, so start over
+            # rather than notifying objects from a previous test
+            monitor = cls(signal)
+            cls._monitors[signal] = monitor
+        return monitor
+
+    def subscribe(self, obj, active_level=True):
+        self.subscribers.append((obj, bool(active_level)))
+
+    def unsubscribe(self, obj):
+        self.subscribers = [s for s in self.subscribers if s[0] is not obj]
+
+    async def _run(self):
+        edge = Edge(self.signal)
+
+        while True:
+            await edge
+            try:
+                level = bool(int(self.signal.value))
+            except ValueError:
+                continue
+            for obj, active_level in list(self.subscribers):
+                obj._ext_reset = level == active_level
+                obj._update_reset()
+
+
 class Reset:
     def _init_reset(self, reset_signal=None, active_level=True):
         self._local_reset = False
@@ -33,7 +73,7 @@ class Reset:
         self._reset_state = True
 
         if reset_signal is not None:
-            cocotb.start_soon(self._run_reset(reset_signal, bool(active_level)))
+            ResetMonitor.get(reset_signal).subscribe(self, active_level)
 
         self._update_reset()
 
@@ -53,17 +93,3 @@ class Reset:
 
     def _handle_reset(self, state):
         pass
-
-    async def _run_reset(self, reset_signal, active_level):
-        while True:
-            await Edge(reset_signal)
-            try:
-                level = bool(int(reset_signal.value))
-            except ValueError:
-                continue
-            if level:
-                self._ext_reset = active_level
-                self._update_reset()
-            else:
-                self._ext_reset = not active_level
-                self._update_reset()
@@ -0,0 +1,126 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import bisect
+
+from .buddy_allocator import BuddyAllocator
+
+
+class SlabAllocator:
+    def __init__(self, size, size_classes=None, slab_size=2**16, align=64):
+        if slab_size < 1 or slab_size & (slab_size-1):
+            raise ValueError("slab size must be a power of two")
+
+        # small pools cannot hold a full slab
+        if slab_size > size:
+            slab_size = 1 << (size.bit_length()-1)
+
+        self.size = size
+        self.slab_size = slab_size
+        self.align = align
+
+        if size_classes is None:
+            # four classes per power of two (1, 1.25, 1.5, 1.75), so that sizes
+            # just over a power of two waste at most 25%, up to a quarter slab
+            size_classes = []
+            k = align
+            while k <= slab_size // 4:
+                size_classes.extend(k*m//4 for m in range(4, 8) if k*m//4 <= slab_size // 4)
+                k *= 2
+
+        self.size_classes = sorted(set(-(-s // align) * align for s in size_classes))
+        if self.size_classes and self.size_classes[-1] > slab_size:
+            raise ValueError("size class larger than slab size")
+
+        self.backing = BuddyAllocator(size, min_alloc=slab_size)
+
+        # slab base -> [size class, free object list]
+        self.slabs = {}
+        # size class -> slabs with free objects
+        self.partial = {s: {} for s in self.size_classes}
+        # address -> size class, None for allocations made directly from backing allocator
+        self.allocations = {}
+
+        self.allocated = 0
+        self.peak_allocated = 0
+
+    def alloc(self, size):
+        if size < 1 or size > self.size:
+            raise ValueError("size out of range")
+
+        index = bisect.bisect_left(self.size_classes, size)
+
+        if index >= len(self.size_classes):
+            # too large for any size class
+            addr = self.backing.alloc(size)
+            self.allocations[addr] = None
+            self.allocated += 2**self.backing.allocations[addr]
+            self.peak_allocated = max(self.peak_allocated, self.allocated)
+            return addr
+
+        cls = self.size_classes[index]
+        partial = self.partial[cls]
+
+        if not partial:
+            # carve new slab
+            base = self.backing.alloc(self.slab_size)
+            objs = list(range(base+(self.slab_size//cls-1)*cls, base-1, -cls))
+            self.slabs[base] = [cls, objs]
+            partial[base] = None
+
+        base = next(iter(partial))
+        objs = self.slabs[base][1]
+        addr = objs.pop()
+        if not objs:
+            del partial[base]
+
+        self.allocations[addr] = cls
+        self.allocated += cls
+        self.peak_allocated = max(self.peak_allocated, self.allocated)
+        return addr
+
+    def free(self, addr):
+        if addr not in self.allocations:
+            raise ValueError("unknown allocation")
+
+        cls = self.allocations.pop(addr)
+
+        if cls is None:
+            self.allocated -= 2**self.backing.allocations[addr]
+            self.backing.free(addr)
+            return
+
+        self.allocated -= cls
+
+        base = addr - addr % self.slab_size
+        objs = self.slabs[base][1]
+        objs.append(addr)
+
+        if len(objs) == self.slab_size // cls:
+            # slab is empty, return it to the backing allocator
+            del self.slabs[base]
+            self.partial[cls].pop(base, None)
+            self.backing.free(base)
+        else:
+            self.partial[cls][base] = None
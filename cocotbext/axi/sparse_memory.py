@@ -22,13 +22,215 @@ THE SOFTWARE.
 
 """
 
-from .utils import hexdump, hexdump_lines, hexdump_str
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+
+from .memory_image import iter_image
+from .watchpoint import Watchpoints
+from .utils import hexdump, hexdump_lines, hexdump_str, fill_pattern, page_digest, combine_digests, DIGEST_BLOCK_SIZE
+
+
+def close_backing_buffer(buf):
+    if isinstance(buf, mmap.mmap):
+        try:
+            buf.close()
+        except BufferError:
+            # views of the mapping are still held elsewhere; the mapping is
+            # released when the last of them goes away
+            pass
+
+
+class BufferBacking:
+    def __init__(self, buf, base=0):
+        self.buf = buf
+        self.base = base
+        self.length = len(buf)
+        # set once captured by a snapshot, the snapshot may outlive the memory
+        self.shared = False
+
+    def close(self):
+        close_backing_buffer(self.buf)
+
+    def pages(self, page_size):
+        return range(self.base & ~(page_size-1), self.base+self.length, page_size)
+
+    def read_page(self, addr, page_size):
+        start = addr - self.base
+        if start >= self.length or start+page_size <= 0:
+            return None
+        if start >= 0 and start+page_size <= self.length:
+            return memoryview(self.buf)[start:start+page_size]
+        # partial page at either end of the buffer
+        page = bytearray(page_size)
+        a = max(start, 0)
+        b = min(start+page_size, self.length)
+        page[a-start:b-start] = self.buf[a:b]
+        return page
+
+
+class CheckpointBacking:
+
+    _header = struct.Struct('<8sQIIQ')
+    _index_entry = struct.Struct('<QQII')
+    _magic = b'SPMEMCK1'
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, last, self.page_size, count, index_offset = self._header.unpack_from(self.buf, 0)
+        if magic != self._magic:
+            raise ValueError("not a memory checkpoint file")
+        self.size = last+1
+        self.index = {}
+        for k in range(count):
+            addr, offset, length, flags = self._index_entry.unpack_from(self.buf, index_offset+k*self._index_entry.size)
+            self.index[addr] = (offset, length, flags)
+        self.cache = {}
+        self.shared = False
+
+    def close(self):
+        self.cache.clear()
+        close_backing_buffer(self.buf)
+
+    def pages(self, page_size):
+        return self.index.keys()
+
+    def read_page(self, addr, page_size):
+        page = self.cache.get(addr)
+        if page is not None:
+            return page
+        try:
+            offset, length, flags = self.index[addr]
+        except KeyError:
+            return None
+        if flags & 1:
+            page = zlib.decompress(self.buf[offset:offset+length])
+            self.cache[addr] = page
+            return page
+        return memoryview(self.buf)[offset:offset+length]
+
+    @classmethod
+    def save(cls, mem, path, compress=True):
+        # write to a temporary file and replace the target, as the target may be
+        # the file currently backing the memory being saved
+        path = os.fspath(path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.tmp-ckpt-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                cls._write(mem, f, compress)
+            # mkstemp creates the file private, use the usual permissions
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def _write(cls, mem, f, compress):
+        index = []
+        f.write(bytes(cls._header.size))
+        for addr, page in mem.iter_pages():
+            if not any(page):
+                continue
+            data = page
+            flags = 0
+            if compress:
+                c = zlib.compress(page, 1)
+                if len(c) < len(page):
+                    data = c
+                    flags = 1
+            index.append((addr, f.tell(), len(data), flags))
+            f.write(data)
+        index_offset = f.tell()
+        for entry in index:
+            f.write(cls._index_entry.pack(*entry))
+        f.seek(0)
+        # store last address so a size of 2**64 fits
+        f.write(cls._header.pack(cls._magic, mem.size-1, mem.page_size, len(index), index_offset))
+
+
+class SparseMemorySnapshot:
+    # snapshots are layered: a snapshot stores only the pages touched since
+    # the previous snapshot (None for dropped pages) and refers to it as its
+    # parent, the first snapshot in a chain stores all pages
+
+    def __init__(self, mem, parent, pages):
+        self.parent = parent
+        self.pages = pages
+        self.size = mem.size
+        self.page_size = mem.page_size
+        self.backing = mem.backing
+        self.path = mem.path
+        if parent is None:
+            self.layered = 0
+        else:
+            self.layered = parent.layered + max(len(pages), 1)
+
+    def _find(self, addr):
+        snap = self
+        while snap is not None:
+            if addr in snap.pages:
+                return snap.pages[addr]
+            snap = snap.parent
+        return None
+
+    def get(self, addr, default=None):
+        page = self._find(addr)
+        return default if page is None else page
+
+    def __getitem__(self, addr):
+        page = self._find(addr)
+        if page is None:
+            raise KeyError(addr)
+        return page
+
+    def __contains__(self, addr):
+        return self._find(addr) is not None
+
+    def materialize(self):
+        chain = []
+        snap = self
+        while snap is not None:
+            chain.append(snap.pages)
+            snap = snap.parent
+        segs = {}
+        for pages in reversed(chain):
+            segs.update(pages)
+        return {addr: page for addr, page in segs.items() if page is not None}
 
 
 class SparseMemory:
-    def __init__(self, size):
+    def __init__(self, size, page_size=4096, backing=None):
+        if page_size < 1 or page_size & (page_size-1):
+            raise ValueError("page size must be a power of two")
         self.size = size
+        self.page_size = page_size
         self.segs = {}
+        self.backing = backing
+        self.path = None
+        self._zero_page = bytes(page_size)
+        # pages not shared with any snapshot, can be modified in place
+        self._owned = set()
+        # pages changed since the last snapshot
+        self._touched = set()
+        self._last_snapshot = None
+
+        # write tracking
+        self.dirty = set()
+        self.page_write_count = {}
+        self.page_last_write = {}
+        self.write_seq = 0
+        self.time_func = None
+
+        self.watchpoints = None
+
+        # digests of DIGEST_BLOCK_SIZE blocks by block address, b'' for zero blocks
+        self._digests = {}
 
     def read(self, address, length, **kwargs):
         if address < 0 or address >= self.size:
@@ -37,43 +239,382 @@ class SparseMemory:
             raise ValueError("invalid length")
         if address+length > self.size:
             raise ValueError("operation out of range")
-        data = bytearray()
+        wp = self.watchpoints
+        if wp is not None and address < wp.hi and address+length > wp.lo:
+            data = self._read(address, length)
+            wp.check('r', address, data)
+            return data
+        return self._read(address, length)
+
+    def _read(self, address, length):
+        page_size = self.page_size
+        block_offset = address & (page_size-1)
+        if block_offset+length <= page_size:
+            # single page
+            block = self.segs.get(address - block_offset)
+            if block is None and self.backing is not None:
+                block = self.backing.read_page(address - block_offset, page_size)
+            if block is None:
+                return bytes(length)
+            return bytes(block[block_offset:block_offset+length])
+        segs = self.segs
+        backing = self.backing
+        zero_page = self._zero_page
+        parts = []
         while length > 0:
-            block_offset = address & 0xfff
+            block_offset = address & (page_size-1)
             block_addr = address - block_offset
-            block_len = min(4096 - block_offset, length)
-            try:
-                block = self.segs[block_addr]
-            except KeyError:
-                block = b'\x00'*4096
-            data.extend(block[block_offset:block_offset+block_len])
+            block_len = min(page_size - block_offset, length)
+            block = segs.get(block_addr)
+            if block is None:
+                if backing is not None:
+                    block = backing.read_page(block_addr, page_size)
+                if block is None:
+                    block = zero_page
+            parts.append(memoryview(block)[block_offset:block_offset+block_len])
             address += block_len
             length -= block_len
-        return bytes(data)
+        return b''.join(parts)
 
     def write(self, address, data, **kwargs):
         if address < 0 or address >= self.size:
             raise ValueError("address out of range")
         if address+len(data) > self.size:
             raise ValueError("operation out of range")
+        wp = self.watchpoints
+        if wp is not None and address < wp.hi and address+len(data) > wp.lo:
+            wp.check('w', address, data)
+        page_size = self.page_size
+        segs = self.segs
+        owned = self._owned
+        dirty = self.dirty
+        digests = self._digests
+        write_count = self.page_write_count
+        last_write = self.page_last_write
+        self.write_seq += 1
+        stamp = self.time_func() if self.time_func else self.write_seq
         offset = 0
         length = len(data)
         while length > 0:
-            block_offset = address & 0xfff
+            block_offset = address & (page_size-1)
             block_addr = address - block_offset
-            block_len = min(4096 - block_offset, length)
-            try:
-                block = self.segs[block_addr]
-            except KeyError:
-                block = bytearray(4096)
-                self.segs[block_addr] = block
+            block_len = min(page_size - block_offset, length)
+            if block_addr in owned:
+                block = segs[block_addr]
+            else:
+                # new page, or page shared with a snapshot
+                block = segs.get(block_addr)
+                if block is None and self.backing is not None:
+                    block = self.backing.read_page(block_addr, page_size)
+                if block is None:
+                    block = bytearray(page_size)
+                else:
+                    block = bytearray(block)
+                segs[block_addr] = block
+                owned.add(block_addr)
+                self._touched.add(block_addr)
             block[block_offset:block_offset+block_len] = data[offset:offset+block_len]
+            dirty.add(block_addr)
+            if digests:
+                self._invalidate_digests(address, block_len)
+            write_count[block_addr] = write_count.get(block_addr, 0) + 1
+            last_write[block_addr] = stamp
             address += block_len
             offset += block_len
             length -= block_len
 
+    def fill(self, address, length, pattern=b'\x00'):
+        if address < 0 or address >= self.size:
+            raise ValueError("address out of range")
+        if length < 0:
+            raise ValueError("invalid length")
+        if address+length > self.size:
+            raise ValueError("operation out of range")
+        if isinstance(pattern, int):
+            pattern = bytes([pattern])
+        pattern = bytes(pattern)
+        if not pattern:
+            raise ValueError("empty pattern")
+        zero = not any(pattern)
+        page_size = self.page_size
+        offset = 0
+        while length > 0:
+            block_offset = address & (page_size-1)
+            block_addr = address - block_offset
+            block_len = min(page_size - block_offset, length)
+            if zero and block_len == page_size and (self.backing is None
+                    or self.backing.read_page(block_addr, page_size) is None):
+                # zero fill of whole page, drop it
+                wp = self.watchpoints
+                if wp is not None and block_addr < wp.hi and block_addr+page_size > wp.lo:
+                    wp.check('w', block_addr, self._zero_page)
+                self._drop_page(block_addr)
+            else:
+                self.write(address, fill_pattern(pattern, block_len, offset))
+            address += block_len
+            offset += block_len
+            length -= block_len
+
+    def _drop_page(self, addr):
+        self.segs.pop(addr, None)
+        self._owned.discard(addr)
+        self._touched.add(addr)
+        self._invalidate_digests(addr, self.page_size)
+        self.dirty.add(addr)
+        self.write_seq += 1
+        self.page_write_count[addr] = self.page_write_count.get(addr, 0) + 1
+        self.page_last_write[addr] = self.time_func() if self.time_func else self.write_seq
+
+    def copy(self, dst, src, length):
+        if length < 0:
+            raise ValueError("invalid length")
+        for address in (dst, src):
+            if address < 0 or address >= self.size:
+                raise ValueError("address out of range")
+            if address+length > self.size:
+                raise ValueError("operation out of range")
+        page_size = self.page_size
+        if src < dst < src+length:
+            # overlapping, copy backwards
+            offset = length
+            while offset > 0:
+                block_len = min(page_size, offset)
+                offset -= block_len
+                self.write(dst+offset, self.read(src+offset, block_len))
+        else:
+            offset = 0
+            while offset < length:
+                block_len = min(page_size, length-offset)
+                self.write(dst+offset, self.read(src+offset, block_len))
+                offset += block_len
+
+    @classmethod
+    def from_file(cls, path, size=2**64, base=0, page_size=4096):
+        with open(path, 'rb') as f:
+            if f.seek(0, 2):
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # empty files cannot be mapped
+                buf = b''
+        if base+len(buf) > size:
+            raise ValueError("file does not fit in memory")
+        mem = cls(size, page_size, BufferBacking(buf, base))
+        mem.path = path
+        return mem
+
+    def flush(self):
+        # write modified pages back to the backing file
+        if self.path is None:
+            raise ValueError("memory is not backed by a file")
+        backing = self.backing
+        with open(self.path, 'r+b') as f:
+            for addr in sorted(self.segs):
+                a = max(addr, backing.base)
+                b = min(addr+self.page_size, backing.base+backing.length)
+                if a < b:
+                    f.seek(a-backing.base)
+                    f.write(self.segs[addr][a-addr:b-addr])
+
+    def watch(self, address, length, callback=None, read=False, write=True):
+        if self.watchpoints is None:
+            self.watchpoints = Watchpoints()
+        return self.watchpoints.add(address, length, callback, read, write)
+
+    def unwatch(self, handle):
+        if self.watchpoints is None:
+            raise ValueError("unknown watchpoint")
+        self.watchpoints.remove(handle)
+
+    def load_image(self, path, fmt=None, base=0):
+        for address, data in iter_image(path, fmt, base, self.page_size):
+            self.write(address, data)
+
+    def save(self, path, compress=True):
+        CheckpointBacking.save(self, path, compress)
+
+    def load(self, path):
+        backing = CheckpointBacking(path)
+        self.clear()
+        self.size = backing.size
+        self.page_size = backing.page_size
+        self._zero_page = bytes(self.page_size)
+        self.backing = backing
+        self.dirty.update(backing.pages(self.page_size))
+
+    def _release_backing(self):
+        backing = self.backing
+        self.backing = None
+        self.path = None
+        if backing is not None and not backing.shared:
+            backing.close()
+
+    def close(self):
+        self._release_backing()
+
+    def _populated(self):
+        pages = set(self.segs)
+        if self.backing is not None:
+            pages.update(self.backing.pages(self.page_size))
+        return pages
+
     def clear(self):
+        self.dirty.update(self._populated())
         self.segs.clear()
+        self._owned.clear()
+        self._touched.clear()
+        self._last_snapshot = None
+        self._digests.clear()
+        self._release_backing()
+
+    def snapshot(self):
+        # pages are shared with the snapshot and copied on the next write; only
+        # the pages touched since the previous snapshot are recorded, with a
+        # full copy once the layers add up to the number of pages
+        last = self._last_snapshot
+        if last is None or last.layered + len(self._touched) >= len(self.segs):
+            snap = SparseMemorySnapshot(self, None, dict(self.segs))
+        else:
+            segs = self.segs
+            snap = SparseMemorySnapshot(self, last, {addr: segs.get(addr) for addr in self._touched})
+        if self.backing is not None:
+            self.backing.shared = True
+        self._owned.clear()
+        self._touched.clear()
+        self._last_snapshot = snap
+        return snap
+
+    def restore(self, snapshot):
+        segs = snapshot.materialize()
+        if (snapshot.backing is not self.backing or snapshot.page_size != self.page_size):
+            self.dirty.update(self._populated())
+            self._digests.clear()
+            if snapshot.backing is not self.backing:
+                self._release_backing()
+            self.size = snapshot.size
+            self.page_size = snapshot.page_size
+            self._zero_page = bytes(self.page_size)
+            self.backing = snapshot.backing
+            self.path = snapshot.path
+            self.segs = segs
+            self.dirty.update(self._populated())
+        else:
+            for addr in set(self.segs).union(segs):
+                if self.segs.get(addr) is not segs.get(addr):
+                    self.dirty.add(addr)
+                    self._invalidate_digests(addr, self.page_size)
+            self.segs = segs
+        self._owned.clear()
+        self._touched.clear()
+        self._last_snapshot = snapshot
+
+    def clear_dirty(self):
+        self.dirty.clear()
+
+    def _get_page(self, addr):
+        page = self.segs.get(addr)
+        if page is None and self.backing is not None:
+            page = self.backing.read_page(addr, self.page_size)
+        if page is None:
+            page = self._zero_page
+        return page
+
+    def iter_pages(self):
+        for addr in sorted(self._populated()):
+            yield addr, self._get_page(addr)
+
+    def iter_dirty_pages(self):
+        for addr in sorted(self.dirty):
+            yield addr, self._get_page(addr)
+
+    def diff(self, other):
+        # compare only pages populated on either side, returns list of differing page addresses
+        if other.page_size == self.page_size:
+            pages = []
+            for addr in sorted(self._populated().union(other._populated())):
+                if self._get_page(addr) != other._get_page(addr):
+                    pages.append(addr)
+            return pages
+
+        # compare at the larger page size
+        page_size = max(self.page_size, other.page_size)
+        addrs = {addr & ~(page_size-1) for addr in self._populated()}
+        addrs.update(addr & ~(page_size-1) for addr in other._populated())
+        pages = []
+        for addr in sorted(addrs):
+            length = min(page_size, self.size-addr, other.size-addr)
+            if length <= 0 or self._read(addr, length) != other._read(addr, length):
+                pages.append(addr)
+        return pages
+
+    def _invalidate_digests(self, address, length):
+        digests = self._digests
+        if digests:
+            bs = DIGEST_BLOCK_SIZE
+            for addr in range(address & ~(bs-1), address+length, bs):
+                digests.pop(addr, None)
+
+    def _block_digest(self, addr):
+        digest = self._digests.get(addr)
+        if digest is None:
+            data = self._read(addr, min(DIGEST_BLOCK_SIZE, self.size-addr))
+            digest = page_digest(data) if any(data) else b''
+            self._digests[addr] = digest
+        return digest
+
+    def _digest_blocks(self, address, end):
+        # addresses of digest blocks overlapping populated pages within range
+        bs = DIGEST_BLOCK_SIZE
+        page_size = self.page_size
+        blocks = set()
+        for addr in self._populated():
+            if addr+page_size <= address or addr >= end:
+                continue
+            blocks.update(range(max(addr, address) & ~(bs-1), min(addr+page_size, end), bs))
+        return blocks
+
+    def _iter_digests(self, address, length):
+        # digests of non-zero blocks or partial blocks within range
+        bs = DIGEST_BLOCK_SIZE
+        end = address+length
+        for addr in sorted(self._digest_blocks(address, end)):
+            a = max(addr, address)
+            b = min(addr+bs, end)
+            if a == addr and (b == addr+bs or b == self.size):
+                digest = self._block_digest(addr)
+                if digest:
+                    yield a, digest
+            else:
+                data = self._read(a, b-a)
+                if any(data):
+                    yield a, page_digest(data)
+
+    def digest(self, address=0, length=None):
+        if length is None:
+            length = self.size - address
+        if address < 0 or length < 0 or address+length > self.size:
+            raise ValueError("operation out of range")
+        return combine_digests(self._iter_digests(address, length))
+
+    def equals(self, other, address=0, length=None):
+        if length is None:
+            length = self.size - address
+        if isinstance(other, SparseMemory):
+            # walk blocks populated on either side, stop at the first difference
+            if address < 0 or length < 0 or address+length > min(self.size, other.size):
+                raise ValueError("operation out of range")
+            bs = DIGEST_BLOCK_SIZE
+            end = address+length
+            blocks = self._digest_blocks(address, end).union(other._digest_blocks(address, end))
+            for addr in sorted(blocks):
+                a = max(addr, address)
+                b = min(addr+bs, end)
+                if a == addr and b == addr+bs:
+                    if self._block_digest(addr) != other._block_digest(addr):
+                        return False
+                elif self._read(a, b-a) != other._read(a, b-a):
+                    return False
+            return True
+        return self.digest(address, length) == other.digest(address, length)
 
     def hexdump(self, address, length, prefix=""):
         hexdump(self.read(address, length), prefix=prefix, offset=address)
@@ -35,6 +35,7 @@ except ImportError:
     pass
 
 from .reset import Reset
+from .bus_shape import bus_shape
 
 
 class StreamBus(Bus):
@@ -109,21 +110,28 @@ class StreamBase(Reset):
         self.ready = None
         self.valid = None
 
-        if self._ready_signal is not None and hasattr(self.bus, self._ready_signal):
+        shape = bus_shape(self.bus)
+
+        if self._ready_signal is not None and shape.has(self._ready_signal):
             self.ready = getattr(self.bus, self._ready_signal)
             if self._ready_init is not None:
                 self.ready.setimmediatevalue(self._ready_init)
 
-        if self._valid_signal is not None and hasattr(self.bus, self._valid_signal):
+        if self._valid_signal is not None and shape.has(self._valid_signal):
             self.valid = getattr(self.bus, self._valid_signal)
             if self._valid_init is not None:
                 self.valid.setimmediatevalue(self._valid_init)
 
-        for sig in self._signals+self._optional_signals:
-            if hasattr(self.bus, sig):
-                if sig in self._signal_widths:
-                    assert len(getattr(self.bus, sig)) == self._signal_widths[sig]
-                if self._init_x and sig not in (self._valid_signal, self._ready_signal):
+        # width constraints only need to be checked once per class and bus shape
+        if type(self) not in shape.checked:
+            for sig, width in self._signal_widths.items():
+                if shape.has(sig):
+                    assert shape.width(sig) == width
+            shape.checked.add(type(self))
+
+        if self._init_x:
+            for sig in self._signals+self._optional_signals:
+                if shape.has(sig) and sig not in (self._valid_signal, self._ready_signal):
                     s = getattr(self.bus, sig)
                     try:
                         v = LogicArray("x"*len(s.value))
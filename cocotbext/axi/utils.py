@@ -22,6 +22,22 @@ THE SOFTWARE.
 
 """
 
+import array
+import hashlib
+import struct
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_word_formats = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+_array_typecodes = {}
+for _t in 'BHILQ':
+    _array_typecodes.setdefault(array.array(_t).itemsize, _t)
+
 
 def hexdump_line(data, offset, row_size=16):
     h = ""
@@ -48,3 +64,75 @@ def hexdump_lines(data, start=0, length=None, row_size=16, prefix="", offset=0):
 
 def hexdump_str(data, start=0, length=None, row_size=16, prefix="", offset=0):
     return "\n".join(hexdump_lines(data, start, length, row_size, prefix, offset))
+
+
+def fill_pattern(pattern, length, phase=0):
+    if isinstance(pattern, int):
+        pattern = bytes([pattern])
+    pattern = bytes(pattern)
+    if not pattern:
+        raise ValueError("empty pattern")
+    phase %= len(pattern)
+    return (pattern*((phase+length)//len(pattern)+1))[phase:phase+length]
+
+
+def unpack_words(data, ws=2, byteorder='little'):
+    fmt = _word_formats.get(ws)
+    count = len(data) // ws
+    if fmt is None:
+        return [int.from_bytes(data[ws*k:ws*(k+1)], byteorder) for k in range(count)]
+    return list(struct.unpack(f"{'<' if byteorder == 'little' else '>'}{count}{fmt}", data[0:count*ws]))
+
+
+def pack_words(words, ws=2, byteorder='little'):
+    if isinstance(words, array.array) and words.itemsize == ws:
+        if byteorder != sys.byteorder:
+            words = array.array(words.typecode, words)
+            words.byteswap()
+        return words.tobytes()
+    if numpy is not None and isinstance(words, numpy.ndarray) and words.dtype.kind in 'ui' and words.dtype.itemsize == ws:
+        return words.astype(words.dtype.newbyteorder('<' if byteorder == 'little' else '>'), copy=False).tobytes()
+    if not isinstance(words, (list, tuple)):
+        words = list(words)
+    fmt = _word_formats.get(ws)
+    if fmt is None:
+        return b''.join(w.to_bytes(ws, byteorder) for w in words)
+    try:
+        return struct.pack(f"{'<' if byteorder == 'little' else '>'}{len(words)}{fmt}", *words)
+    except struct.error:
+        # out of range or non-integer word, raise the same error as int.to_bytes
+        return b''.join(w.to_bytes(ws, byteorder) for w in words)
+
+
+def words_to_array(data, ws=2, byteorder='little'):
+    typecode = _array_typecodes.get(ws)
+    if typecode is None:
+        raise ValueError("unsupported word size")
+    arr = array.array(typecode, data)
+    if byteorder != sys.byteorder:
+        arr.byteswap()
+    return arr
+
+
+def words_to_ndarray(data, ws=2, byteorder='little'):
+    if numpy is None:
+        raise ImportError("numpy is required")
+    return numpy.frombuffer(data, dtype=f"{'<' if byteorder == 'little' else '>'}u{ws}")
+
+
+# digests are computed over aligned blocks of this size, independent of how
+# the memory is stored, so that memories of different types can be compared
+DIGEST_BLOCK_SIZE = 4096
+
+
+def page_digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def combine_digests(pages):
+    # pages: iterable of (address, digest) for non-zero blocks in address order
+    h = hashlib.blake2b(digest_size=16)
+    for addr, digest in pages:
+        h.update(addr.to_bytes(8, 'little'))
+        h.update(digest)
+    return h.digest()
@@ -0,0 +1,86 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import bisect
+
+
+class Watchpoints:
+    def __init__(self):
+        self.entries = []
+        self.starts = []
+        self.trace = []
+        self.next_handle = 0
+
+        # bounding range of all watchpoints, for a fast overlap check
+        self.lo = 0
+        self.hi = 0
+        self.max_len = 0
+
+    def add(self, address, length, callback=None, read=False, write=True):
+        if length < 1:
+            raise ValueError("invalid length")
+        handle = self.next_handle
+        self.next_handle += 1
+        index = bisect.bisect_right(self.starts, address)
+        self.starts.insert(index, address)
+        self.entries.insert(index, (address, address+length, callback, read, write, handle))
+        self._update()
+        return handle
+
+    def remove(self, handle):
+        for index, entry in enumerate(self.entries):
+            if entry[5] == handle:
+                del self.entries[index]
+                del self.starts[index]
+                self._update()
+                return
+        raise ValueError("unknown watchpoint")
+
+    def clear(self):
+        self.entries.clear()
+        self.starts.clear()
+        self._update()
+
+    def _update(self):
+        if self.entries:
+            self.lo = self.starts[0]
+            self.hi = max(e[1] for e in self.entries)
+            self.max_len = max(e[1]-e[0] for e in self.entries)
+        else:
+            self.lo = self.hi = self.max_len = 0
+
+    def check(self, op, address, data):
+        end = address+len(data)
+        index = bisect.bisect_right(self.starts, address-self.max_len)
+        stop = bisect.bisect_left(self.starts, end)
+        traced = False
+        for start, wp_end, callback, read, write, handle in self.entries[index:stop]:
+            if wp_end <= address:
+                continue
+            if (read if op == 'r' else write):
+                if callback is not None:
+                    callback(op, address, data)
+                elif not traced:
+                    self.trace.append((op, address, bytes(data)))
+                    traced = True
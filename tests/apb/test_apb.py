@@ -34,12 +34,13 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
 from cocotb.regression import TestFactory
+from cocotb.utils import get_sim_time
 
-from cocotbext.axi import ApbBus, ApbMaster, ApbRam
+from cocotbext.axi import ApbBus, ApbMaster, ApbRam, AxiResp
 
 
 class TB:
-    def __init__(self, dut):
+    def __init__(self, dut, back_to_back=False):
         self.dut = dut
 
         self.log = logging.getLogger("cocotb.tb")
@@ -47,7 +48,7 @@ class TB:
 
         cocotb.start_soon(Clock(dut.clk, 2, units="ns").start())
 
-        self.apb_master = ApbMaster(ApbBus.from_prefix(dut, "apb"), dut.clk, dut.rst)
+        self.apb_master = ApbMaster(ApbBus.from_prefix(dut, "apb"), dut.clk, dut.rst, back_to_back=back_to_back)
         self.apb_ram = ApbRam(ApbBus.from_prefix(dut, "apb"), dut.clk, dut.rst, size=2**16)
 
     def set_idle_generator(self, generator=None):
@@ -237,6 +238,248 @@ async def run_test_read_words(dut):
     await RisingEdge(dut.clk)
 
 
+async def timed(coro):
+    start = get_sim_time('ns')
+    ret = await coro
+    return ret, get_sim_time('ns') - start
+
+
+async def run_test_wait_states(dut):
+
+    tb = TB(dut)
+
+    byte_lanes = tb.apb_master.byte_lanes
+    period = 2
+
+    await tb.cycle_reset()
+
+    addr = 0x1000
+    test_data = bytearray([x % 256 for x in range(byte_lanes)])
+
+    _, t_write = await timed(tb.apb_master.write(addr, test_data))
+    _, t_read = await timed(tb.apb_master.read(addr, byte_lanes))
+
+    tb.log.info("fixed")
+    tb.apb_ram.set_wait_states(3)
+    _, t = await timed(tb.apb_master.write(addr, test_data))
+    assert t == t_write + 3*period
+    _, t = await timed(tb.apb_master.read(addr, byte_lanes))
+    assert t == t_read + 3*period
+
+    tb.log.info("address range and direction")
+    tb.apb_ram.clear_wait_states()
+    tb.apb_ram.set_wait_states(5, base=0x2000, size=0x1000, read=False)
+    _, t = await timed(tb.apb_master.write(addr, test_data))
+    assert t == t_write
+    _, t = await timed(tb.apb_master.write(0x2000, test_data))
+    assert t == t_write + 5*period
+    _, t = await timed(tb.apb_master.read(0x2000, byte_lanes))
+    assert t == t_read
+
+    tb.log.info("random")
+    tb.apb_ram.clear_wait_states()
+    tb.apb_ram.set_wait_states((1, 4))
+    for k in range(16):
+        _, t = await timed(tb.apb_master.write(addr, test_data))
+        assert t_write + 1*period <= t <= t_write + 4*period
+
+    tb.log.info("iterable")
+    tb.apb_ram.clear_wait_states()
+    tb.apb_ram.set_wait_states([1, 2, 3])
+    for w in [1, 2, 3, 0, 0]:
+        _, t = await timed(tb.apb_master.write(addr, test_data))
+        assert t == t_write + w*period
+
+    tb.log.info("callable")
+    tb.apb_ram.clear_wait_states()
+    calls = []
+
+    def wait_func(address, pwrite):
+        calls.append((address, pwrite))
+        return 4 if pwrite else 1
+
+    tb.apb_ram.set_wait_states(wait_func)
+    _, t = await timed(tb.apb_master.write(addr, test_data))
+    assert t == t_write + 4*period
+    data, t = await timed(tb.apb_master.read(addr, byte_lanes))
+    assert t == t_read + 1*period
+    assert data.data == test_data
+    assert calls == [(addr, True), (addr, False)]
+
+    tb.apb_ram.clear_wait_states()
+    _, t = await timed(tb.apb_master.write(addr, test_data))
+    assert t == t_write
+
+    with pytest.raises(ValueError):
+        tb.apb_ram.set_wait_states(-1)
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_errors(dut):
+
+    tb = TB(dut)
+
+    byte_lanes = tb.apb_master.byte_lanes
+
+    await tb.cycle_reset()
+
+    test_data = bytearray([x % 256 for x in range(byte_lanes)])
+
+    tb.apb_ram.write(0x2000, b'\xaa'*byte_lanes)
+    tb.apb_ram.write(0x3000, b'\xaa'*byte_lanes)
+
+    tb.apb_ram.set_error(base=0x2000, size=0x1000)
+    tb.apb_ram.set_error(base=0x3000, size=0x1000, write=False)
+
+    # errors complete without performing the operation
+    resp = await tb.apb_master.write(0x2000, test_data)
+    assert resp.resp == AxiResp.SLVERR
+    assert tb.apb_ram.read(0x2000, byte_lanes) == b'\xaa'*byte_lanes
+    data = await tb.apb_master.read(0x2000, byte_lanes)
+    assert data.resp == AxiResp.SLVERR
+    assert data.data == bytes(byte_lanes)
+
+    # read errors only
+    resp = await tb.apb_master.write(0x3000, test_data)
+    assert resp.resp == AxiResp.OKAY
+    assert tb.apb_ram.read(0x3000, byte_lanes) == test_data
+    data = await tb.apb_master.read(0x3000, byte_lanes)
+    assert data.resp == AxiResp.SLVERR
+
+    # outside of error ranges
+    resp = await tb.apb_master.write(0x1000, test_data)
+    assert resp.resp == AxiResp.OKAY
+    data = await tb.apb_master.read(0x1000, byte_lanes)
+    assert data.resp == AxiResp.OKAY
+    assert data.data == test_data
+
+    # most recent range takes precedence
+    tb.apb_ram.set_error(base=0x2000, size=0x100, error=False)
+    data = await tb.apb_master.read(0x2000, byte_lanes)
+    assert data.resp == AxiResp.OKAY
+    assert data.data == b'\xaa'*byte_lanes
+    data = await tb.apb_master.read(0x2100, byte_lanes)
+    assert data.resp == AxiResp.SLVERR
+
+    tb.apb_ram.clear_errors()
+    data = await tb.apb_master.read(0x3000, byte_lanes)
+    assert data.resp == AxiResp.OKAY
+    assert data.data == test_data
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_idle(dut):
+
+    tb = TB(dut)
+
+    byte_lanes = tb.apb_master.byte_lanes
+
+    await tb.cycle_reset()
+
+    # the slave sleeps until psel rises while idle
+    for gap in [0, 1, 2, 5, 100]:
+        tb.log.info("idle gap %d", gap)
+        for k in range(gap):
+            await RisingEdge(dut.clk)
+
+        addr = 0x1000+gap*byte_lanes
+        test_data = bytearray([(x+gap) % 256 for x in range(byte_lanes)])
+        await tb.apb_master.write(addr, test_data)
+        assert tb.apb_ram.read(addr, byte_lanes) == test_data
+        assert (await tb.apb_master.read(addr, byte_lanes)).data == test_data
+
+    # reset in the middle of a transfer
+    tb.apb_ram.set_wait_states(20)
+    event = tb.apb_master.init_write(0x2000, bytes(byte_lanes))
+
+    for k in range(5):
+        await RisingEdge(dut.clk)
+    assert int(dut.apb_psel.value)
+
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+    assert not int(dut.apb_pready.value)
+    dut.rst.value = 0
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+    await event.wait()
+    assert event.data is None
+
+    tb.apb_ram.clear_wait_states()
+
+    test_data = bytearray([x % 256 for x in range(byte_lanes)])
+    await tb.apb_master.write(0x2000, test_data)
+    assert tb.apb_ram.read(0x2000, byte_lanes) == test_data
+    assert (await tb.apb_master.read(0x2000, byte_lanes)).data == test_data
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_back_to_back(dut, back_to_back=False):
+
+    tb = TB(dut, back_to_back=back_to_back)
+
+    byte_lanes = tb.apb_master.byte_lanes
+    period = 2
+    count = 8
+
+    await tb.cycle_reset()
+
+    psel = []
+
+    async def monitor():
+        while True:
+            await RisingEdge(dut.clk)
+            psel.append(int(dut.apb_psel.value))
+
+    for write in [True, False]:
+        tb.log.info("back-to-back %s, write %s", back_to_back, write)
+
+        if write:
+            await tb.apb_master.write(0x1000, bytes(byte_lanes))
+        else:
+            await tb.apb_master.read(0x1000, byte_lanes)
+
+        psel.clear()
+        monitor_cr = cocotb.start_soon(monitor())
+        times = [get_sim_time('ns')]
+
+        # sequential awaited single-word accesses
+        for k in range(count):
+            addr = 0x1000+k*byte_lanes
+            test_data = bytearray([(x+k) % 256 for x in range(byte_lanes)])
+            if write:
+                await tb.apb_master.write(addr, test_data)
+                assert tb.apb_ram.read(addr, byte_lanes) == test_data
+            else:
+                tb.apb_ram.write(addr, test_data)
+                assert (await tb.apb_master.read(addr, byte_lanes)).data == test_data
+            times.append(get_sim_time('ns'))
+
+        monitor_cr.kill()
+
+        cycles = [(b-a) // period for a, b in zip(times, times[1:])]
+        tb.log.info("cycles per access: %s", cycles)
+
+        if back_to_back:
+            # setup and access phase only, psel held between accesses
+            assert cycles == [2]*count
+            assert psel and all(psel)
+        else:
+            assert cycles == [3]*count
+            assert not all(psel)
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
 async def run_stress_test(dut, idle_inserter=None, backpressure_inserter=None):
 
     tb = TB(dut)
@@ -286,11 +529,16 @@ if getattr(cocotb, 'top', None) is not None:
         factory.add_option("backpressure_inserter", [None, cycle_pause])
         factory.generate_tests()
 
-    for test in [run_test_write_words, run_test_read_words]:
+    for test in [run_test_write_words, run_test_read_words, run_test_wait_states, run_test_errors,
+            run_test_idle]:
 
         factory = TestFactory(test)
         factory.generate_tests()
 
+    factory = TestFactory(run_test_back_to_back)
+    factory.add_option("back_to_back", [False, True])
+    factory.generate_tests()
+
     factory = TestFactory(run_stress_test)
     factory.generate_tests()
 
@@ -0,0 +1,257 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import itertools
+import logging
+import os
+
+import cocotb_test.simulator
+import pytest
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotb.regression import TestFactory
+
+from cocotbext.axi import ApbBus, ApbMaster, ApbInterconnect
+from cocotbext.axi import MemoryRegion, RegisterBank, AxiResp
+
+
+class Peripheral:
+    # plain object with read and write methods, wrapped in a PeripheralRegion
+    def __init__(self, size):
+        self.mem = bytearray(size)
+
+    def read(self, address, length):
+        return bytes(self.mem[address:address+length])
+
+    def write(self, address, data):
+        self.mem[address:address+len(data)] = data
+
+
+class TB:
+    def __init__(self, dut):
+        self.dut = dut
+
+        self.log = logging.getLogger("cocotb.tb")
+        self.log.setLevel(logging.DEBUG)
+
+        cocotb.start_soon(Clock(dut.clk, 2, units="ns").start())
+
+        dut.psel_extra.setimmediatevalue(0)
+
+        self.apb_master = ApbMaster(ApbBus.from_prefix(dut, "s_apb"), dut.clk, dut.rst)
+        self.apb_ic = ApbInterconnect(ApbBus.from_prefix(dut, "m_apb"), dut.clk, dut.rst)
+
+        # lane 0: memory, lane 1: register bank, lane 2: plain object, lane 3: unmapped
+        self.mem = MemoryRegion(0x1000)
+        self.apb_ic.add_slave(self.mem, 0x0000)
+
+        self.regs = RegisterBank(0x1000)
+        self.regs.add_register("ctrl", 0x0, reset=0x12345678)
+        self.regs.add_register("data", 0x4)
+        self.apb_ic.add_slave(self.regs, 0x1000)
+
+        self.periph = Peripheral(0x1000)
+        self.apb_ic.add_slave(self.periph, 0x2000, 0x1000)
+
+        self.lanes = set()
+        self.lane_errors = []
+        cocotb.start_soon(self._monitor_lanes())
+
+    async def _monitor_lanes(self):
+        # responses must only be driven on the lane of the selected peripheral
+        while True:
+            await RisingEdge(self.dut.clk)
+            if not self.dut.m_apb_pready.value.is_resolvable or not self.dut.m_apb_psel.value.is_resolvable:
+                continue
+            pready = int(self.dut.m_apb_pready.value)
+            psel = int(self.dut.m_apb_psel.value)
+            if pready:
+                self.lanes.add(pready.bit_length()-1)
+                if pready != psel:
+                    self.lane_errors.append((pready, psel))
+
+    def set_idle_generator(self, generator=None):
+        if generator:
+            self.apb_master.set_pause_generator(generator())
+
+    def set_backpressure_generator(self, generator=None):
+        if generator:
+            self.apb_ic.set_pause_generator(generator())
+
+    async def cycle_reset(self):
+        self.dut.rst.setimmediatevalue(0)
+        await RisingEdge(self.dut.clk)
+        await RisingEdge(self.dut.clk)
+        self.dut.rst.value = 1
+        await RisingEdge(self.dut.clk)
+        await RisingEdge(self.dut.clk)
+        self.dut.rst.value = 0
+        await RisingEdge(self.dut.clk)
+        await RisingEdge(self.dut.clk)
+
+
+async def run_test_decode(dut, idle_inserter=None, backpressure_inserter=None):
+
+    tb = TB(dut)
+
+    byte_lanes = tb.apb_master.byte_lanes
+
+    await tb.cycle_reset()
+
+    tb.set_idle_generator(idle_inserter)
+    tb.set_backpressure_generator(backpressure_inserter)
+
+    for length in range(1, byte_lanes*2):
+        for offset in range(byte_lanes):
+            tb.log.info("length %d, offset %d", length, offset)
+            test_data = bytearray([(x+length) % 256 for x in range(length)])
+
+            # memory region
+            addr = 0x0100+offset
+            resp = await tb.apb_master.write(addr, test_data)
+            assert resp.resp == AxiResp.OKAY
+            assert tb.mem[addr:addr+length] == test_data
+            data = await tb.apb_master.read(addr, length)
+            assert data.resp == AxiResp.OKAY
+            assert data.data == test_data
+
+            # plain object
+            addr = 0x2100+offset
+            resp = await tb.apb_master.write(addr, test_data)
+            assert resp.resp == AxiResp.OKAY
+            assert tb.periph.mem[addr-0x2000:addr-0x2000+length] == test_data
+            data = await tb.apb_master.read(addr, length)
+            assert data.resp == AxiResp.OKAY
+            assert data.data == test_data
+
+    # register bank
+    assert await tb.apb_master.read_dword(0x1000) == 0x12345678
+    await tb.apb_master.write_dword(0x1004, 0xdeadbeef)
+    assert tb.regs["data"].value == 0xdeadbeef
+    assert await tb.apb_master.read_dword(0x1004) == 0xdeadbeef
+
+    # unmapped
+    resp = await tb.apb_master.write(0x3000, b'test')
+    assert resp.resp == AxiResp.SLVERR
+    data = await tb.apb_master.read(0x3000, 4)
+    assert data.resp == AxiResp.SLVERR
+    assert data.data == bytes(4)
+
+    # removed peripheral
+    tb.apb_ic.remove_slave(tb.mem)
+    data = await tb.apb_master.read(0x0100, 4)
+    assert data.resp == AxiResp.SLVERR
+
+    assert tb.lanes == {0, 1, 2, 3}
+    assert not tb.lane_errors
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_psel_error(dut):
+
+    tb = TB(dut)
+
+    await tb.cycle_reset()
+
+    tb.mem[0x0100:0x0104] = b'\x11\x22\x33\x44'
+
+    # select lanes 0 and 2 at the same time
+    dut.psel_extra.value = 0b0100
+
+    resp = await tb.apb_master.write(0x0100, b'test')
+    assert resp.resp == AxiResp.SLVERR
+    assert tb.mem[0x0100:0x0104] == b'\x11\x22\x33\x44'
+    assert tb.periph.mem[0x0100:0x0104] == bytes(4)
+
+    data = await tb.apb_master.read(0x0100, 4)
+    assert data.resp == AxiResp.SLVERR
+    assert data.data == bytes(4)
+
+    dut.psel_extra.value = 0
+
+    data = await tb.apb_master.read(0x0100, 4)
+    assert data.resp == AxiResp.OKAY
+    assert data.data == b'\x11\x22\x33\x44'
+
+    assert not tb.lane_errors
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+def cycle_pause():
+    return itertools.cycle([1, 1, 1, 0])
+
+
+if getattr(cocotb, 'top', None) is not None:
+
+    factory = TestFactory(run_test_decode)
+    factory.add_option("idle_inserter", [None, cycle_pause])
+    factory.add_option("backpressure_inserter", [None, cycle_pause])
+    factory.generate_tests()
+
+    factory = TestFactory(run_test_psel_error)
+    factory.generate_tests()
+
+
+# cocotb-test
+
+tests_dir = os.path.dirname(__file__)
+
+
+@pytest.mark.parametrize("data_w", [8, 16, 32])
+def test_apb_interconnect(request, data_w):
+    dut = "test_apb_interconnect"
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    toplevel = dut
+
+    verilog_sources = [
+        os.path.join(os.path.dirname(__file__), f"{dut}.v"),
+    ]
+
+    parameters = {}
+
+    parameters['DATA_W'] = data_w
+    parameters['ADDR_W'] = 16
+    parameters['STRB_W'] = parameters['DATA_W'] // 8
+    parameters['SEL_W'] = 4
+
+    extra_env = {f'PARAM_{k}': str(v) for k, v in parameters.items()}
+
+    sim_build = os.path.join(tests_dir, "sim_build",
+        request.node.name.replace('[', '-').replace(']', ''))
+
+    cocotb_test.simulator.run(
+        python_search=[tests_dir],
+        verilog_sources=verilog_sources,
+        toplevel=toplevel,
+        module=module,
+        parameters=parameters,
+        sim_build=sim_build,
+        extra_env=extra_env,
+    )
@@ -0,0 +1,88 @@
+/*
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+*/
+
+// Language: Verilog 2001
+
+`timescale 1ns / 1ns
+
+/*
+ * APB interconnect test module
+ *
+ * Decodes s_apb into a psel vector on m_apb, one bit per 4 KB aperture,
+ * and returns the response from the lane of the selected peripheral;
+ * psel_extra is ORed into the psel vector to test non-one-hot selects
+ */
+module test_apb_interconnect #
+(
+    parameter DATA_W = 32,
+    parameter ADDR_W = 16,
+    parameter STRB_W = (DATA_W/8),
+    parameter SEL_W = 4
+)
+(
+    input  wire                     clk,
+    input  wire                     rst,
+
+    inout  wire [SEL_W-1:0]         psel_extra,
+
+    inout  wire [ADDR_W-1:0]        s_apb_paddr,
+    inout  wire [2:0]               s_apb_pprot,
+    inout  wire                     s_apb_psel,
+    inout  wire                     s_apb_penable,
+    inout  wire                     s_apb_pwrite,
+    inout  wire [DATA_W-1:0]        s_apb_pwdata,
+    inout  wire [STRB_W-1:0]        s_apb_pstrb,
+    output wire                     s_apb_pready,
+    output wire [DATA_W-1:0]        s_apb_prdata,
+    output wire                     s_apb_pslverr,
+
+    output wire [ADDR_W-1:0]        m_apb_paddr,
+    output wire [2:0]               m_apb_pprot,
+    output wire [SEL_W-1:0]         m_apb_psel,
+    output wire                     m_apb_penable,
+    output wire                     m_apb_pwrite,
+    output wire [DATA_W-1:0]        m_apb_pwdata,
+    output wire [STRB_W-1:0]        m_apb_pstrb,
+    inout  wire [SEL_W-1:0]         m_apb_pready,
+    inout  wire [SEL_W*DATA_W-1:0]  m_apb_prdata,
+    inout  wire [SEL_W-1:0]         m_apb_pslverr
+);
+
+localparam SEL_BITS = SEL_W > 1 ? $clog2(SEL_W) : 1;
+
+wire [SEL_BITS-1:0] sel = s_apb_paddr[12 +: SEL_BITS];
+
+assign m_apb_paddr = s_apb_paddr;
+assign m_apb_pprot = s_apb_pprot;
+assign m_apb_psel = s_apb_psel ? ({{SEL_W-1{1'b0}}, 1'b1} << sel) | psel_extra : {SEL_W{1'b0}};
+assign m_apb_penable = s_apb_penable;
+assign m_apb_pwrite = s_apb_pwrite;
+assign m_apb_pwdata = s_apb_pwdata;
+assign m_apb_pstrb = s_apb_pstrb;
+
+assign s_apb_pready = m_apb_pready[sel];
+assign s_apb_prdata = m_apb_prdata[sel*DATA_W +: DATA_W];
+assign s_apb_pslverr = m_apb_pslverr[sel];
+
+endmodule
@@ -36,10 +36,11 @@ from cocotb.triggers import RisingEdge, Timer
 from cocotb.regression import TestFactory
 
 from cocotbext.axi import AxiLiteBus, AxiLiteMaster, AxiLiteRam
+from cocotbext.axi.reset import ResetMonitor
 
 
 class TB:
-    def __init__(self, dut):
+    def __init__(self, dut, max_outstanding=2, aw_credits=4, w_credits=4):
         self.dut = dut
 
         self.log = logging.getLogger("cocotb.tb")
@@ -47,8 +48,10 @@ class TB:
 
         cocotb.start_soon(Clock(dut.clk, 2, units="ns").start())
 
-        self.axil_master = AxiLiteMaster(AxiLiteBus.from_prefix(dut, "axil"), dut.clk, dut.rst)
-        self.axil_ram = AxiLiteRam(AxiLiteBus.from_prefix(dut, "axil"), dut.clk, dut.rst, size=2**16)
+        self.axil_master = AxiLiteMaster(AxiLiteBus.from_prefix(dut, "axil"), dut.clk, dut.rst,
+            aw_credits=aw_credits, w_credits=w_credits)
+        self.axil_ram = AxiLiteRam(AxiLiteBus.from_prefix(dut, "axil"), dut.clk, dut.rst, size=2**16,
+            max_outstanding=max_outstanding)
 
     def set_idle_generator(self, generator=None):
         if generator:
@@ -78,9 +81,9 @@ class TB:
         await RisingEdge(self.dut.clk)
 
 
-async def run_test_write(dut, data_in=None, idle_inserter=None, backpressure_inserter=None):
+async def run_test_write(dut, data_in=None, idle_inserter=None, backpressure_inserter=None, max_outstanding=2):
 
-    tb = TB(dut)
+    tb = TB(dut, max_outstanding)
 
     byte_lanes = tb.axil_master.write_if.byte_lanes
 
@@ -109,9 +112,9 @@ async def run_test_write(dut, data_in=None, idle_inserter=None, backpressure_ins
     await RisingEdge(dut.clk)
 
 
-async def run_test_read(dut, data_in=None, idle_inserter=None, backpressure_inserter=None):
+async def run_test_read(dut, data_in=None, idle_inserter=None, backpressure_inserter=None, max_outstanding=2):
 
-    tb = TB(dut)
+    tb = TB(dut, max_outstanding)
 
     byte_lanes = tb.axil_master.write_if.byte_lanes
 
@@ -245,10 +248,244 @@ async def run_test_read_words(dut):
     await RisingEdge(dut.clk)
 
 
-async def run_stress_test(dut, idle_inserter=None, backpressure_inserter=None):
+async def run_test_credits(dut, aw_credits=4, w_credits=4):
+
+    tb = TB(dut, max_outstanding=16, aw_credits=aw_credits, w_credits=w_credits)
+
+    byte_lanes = tb.axil_master.write_if.byte_lanes
+    count = 16
+
+    await tb.cycle_reset()
+
+    handshakes = {'aw': 0, 'w': 0}
+
+    async def monitor():
+        while True:
+            await RisingEdge(dut.clk)
+            if int(dut.axil_awvalid.value) and int(dut.axil_awready.value):
+                handshakes['aw'] += 1
+            if int(dut.axil_wvalid.value) and int(dut.axil_wready.value):
+                handshakes['w'] += 1
+
+    monitor_cr = cocotb.start_soon(monitor())
+
+    # stall write responses, AW and W each stop when out of credits
+    tb.axil_master.write_if.b_channel.pause = True
+
+    events = []
+    for k in range(count):
+        addr = 0x1000+k*byte_lanes
+        events.append(tb.axil_master.init_write(addr, bytes([k+1])*byte_lanes))
+
+    for k in range(count*4):
+        await RisingEdge(dut.clk)
+
+    tb.log.info("AW credits %d, W credits %d, handshakes with B stalled: %s", aw_credits, w_credits, handshakes)
+
+    assert handshakes['aw'] == aw_credits
+    assert handshakes['w'] == w_credits
+
+    tb.axil_master.write_if.b_channel.pause = False
+
+    for event in events:
+        await event.wait()
+
+    assert handshakes['aw'] == count
+    assert handshakes['w'] == count
+
+    for k in range(count):
+        assert tb.axil_ram.read(0x1000+k*byte_lanes, byte_lanes) == bytes([k+1])*byte_lanes
+
+    monitor_cr.kill()
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_outstanding(dut, max_outstanding=2):
+
+    tb = TB(dut, max_outstanding, aw_credits=16, w_credits=16)
+
+    byte_lanes = tb.axil_master.write_if.byte_lanes
+    count = 16
+
+    await tb.cycle_reset()
+
+    # stall write responses, the slave accepts and performs writes until its
+    # response queue is full
+    tb.axil_master.write_if.b_channel.pause = True
+
+    events = []
+    for k in range(count):
+        addr = 0x1000+k*byte_lanes
+        events.append(tb.axil_master.init_write(addr, bytes([k+1])*byte_lanes))
+
+    for k in range(count*4):
+        await RisingEdge(dut.clk)
+
+    done = sum(tb.axil_ram.read(0x1000+k*byte_lanes, 1) != b'\x00' for k in range(count))
+    tb.log.info("max outstanding %d, writes accepted with B stalled: %d", max_outstanding, done)
+
+    assert max_outstanding <= done <= max_outstanding+2
+    assert not any(event.is_set() for event in events)
+
+    tb.axil_master.write_if.b_channel.pause = False
+
+    for event in events:
+        await event.wait()
+
+    for k in range(count):
+        assert tb.axil_ram.read(0x1000+k*byte_lanes, byte_lanes) == bytes([k+1])*byte_lanes
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_write_stall(dut):
 
     tb = TB(dut)
 
+    byte_lanes = tb.axil_master.write_if.byte_lanes
+    count = 8
+
+    await tb.cycle_reset()
+
+    handshakes = {'aw': 0, 'w': 0}
+
+    async def monitor():
+        while True:
+            await RisingEdge(dut.clk)
+            if int(dut.axil_awvalid.value) and int(dut.axil_awready.value):
+                handshakes['aw'] += 1
+            if int(dut.axil_wvalid.value) and int(dut.axil_wready.value):
+                handshakes['w'] += 1
+
+    monitor_cr = cocotb.start_soon(monitor())
+
+    for stalled, running in [('aw', 'w'), ('w', 'aw')]:
+        tb.log.info("stall %s", stalled)
+
+        for k in range(count):
+            tb.axil_ram.write(0x1000+k*byte_lanes, bytes(byte_lanes))
+
+        handshakes['aw'] = handshakes['w'] = 0
+
+        # the address and data streams are issued independently, so one
+        # keeps going while the other is stalled at the slave
+        stalled_channel = getattr(tb.axil_ram.write_if, f"{stalled}_channel")
+        stalled_channel.pause = True
+
+        events = []
+        for k in range(count):
+            addr = 0x1000+k*byte_lanes
+            events.append(tb.axil_master.init_write(addr, bytes([k+1])*byte_lanes))
+
+        for k in range(count*4):
+            await RisingEdge(dut.clk)
+
+        tb.log.info("handshakes while %s stalled: %s", stalled, handshakes)
+
+        assert handshakes[stalled] == 0
+        assert handshakes[running] > 0
+        assert not any(event.is_set() for event in events)
+
+        stalled_channel.pause = False
+
+        for event in events:
+            await event.wait()
+
+        assert handshakes['aw'] == count
+        assert handshakes['w'] == count
+
+        for k in range(count):
+            assert tb.axil_ram.read(0x1000+k*byte_lanes, byte_lanes) == bytes([k+1])*byte_lanes
+
+    monitor_cr.kill()
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_test_reset(dut):
+
+    tb = TB(dut)
+
+    byte_lanes = tb.axil_master.write_if.byte_lanes
+    count = 16
+
+    await tb.cycle_reset()
+
+    # master, RAM, and all of their channels share one reset monitor
+    models = [
+        tb.axil_master.write_if, tb.axil_master.read_if,
+        tb.axil_ram.write_if, tb.axil_ram.read_if,
+        tb.axil_master.write_if.aw_channel, tb.axil_master.write_if.w_channel,
+        tb.axil_master.write_if.b_channel, tb.axil_ram.write_if.aw_channel,
+        tb.axil_ram.write_if.w_channel, tb.axil_ram.write_if.b_channel,
+        tb.axil_master.read_if.ar_channel, tb.axil_master.read_if.r_channel,
+        tb.axil_ram.read_if.ar_channel, tb.axil_ram.read_if.r_channel,
+    ]
+    subscribers = [obj for obj, level in ResetMonitor.get(dut.rst).subscribers]
+    for obj in models:
+        assert sum(obj is s for s in subscribers) == 1
+
+    tb.set_backpressure_generator(cycle_pause)
+
+    events = []
+    for k in range(count):
+        addr = 0x1000+k*byte_lanes
+        events.append(tb.axil_master.init_write(addr, bytes([k+1])*byte_lanes))
+        events.append(tb.axil_master.init_read(addr, byte_lanes))
+
+    for k in range(8):
+        await RisingEdge(dut.clk)
+
+    # assert reset with operations in flight
+    dut.rst.value = 1
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+    for obj in models:
+        assert obj._reset_state
+    assert not int(dut.axil_awvalid.value)
+    assert not int(dut.axil_wvalid.value)
+    assert not int(dut.axil_bvalid.value)
+    assert not int(dut.axil_arvalid.value)
+    assert not int(dut.axil_rvalid.value)
+
+    dut.rst.value = 0
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+    for obj in models:
+        assert not obj._reset_state
+
+    # flushed operations complete without a response
+    flushed = 0
+    for event in events:
+        await event.wait()
+        if event.data is None:
+            flushed += 1
+    tb.log.info("operations flushed by reset: %d", flushed)
+    assert flushed > 0
+
+    # all models resume after reset
+    for k in range(count):
+        addr = 0x1000+k*byte_lanes
+        test_data = bytearray([(x+k) % 256 for x in range(byte_lanes)])
+        await tb.axil_master.write(addr, test_data)
+        assert tb.axil_ram.read(addr, byte_lanes) == test_data
+        data = await tb.axil_master.read(addr, byte_lanes)
+        assert data.data == test_data
+
+    await RisingEdge(dut.clk)
+    await RisingEdge(dut.clk)
+
+
+async def run_stress_test(dut, idle_inserter=None, backpressure_inserter=None, max_outstanding=2):
+
+    tb = TB(dut, max_outstanding)
+
     await tb.cycle_reset()
 
     tb.set_idle_generator(idle_inserter)
@@ -292,6 +529,7 @@ if getattr(cocotb, 'top', None) is not None:
         factory = TestFactory(test)
         factory.add_option("idle_inserter", [None, cycle_pause])
         factory.add_option("backpressure_inserter", [None, cycle_pause])
+        factory.add_option("max_outstanding", [1, 2, 4])
         factory.generate_tests()
 
     for test in [run_test_write_words, run_test_read_words]:
@@ -299,7 +537,21 @@ if getattr(cocotb, 'top', None) is not None:
         factory = TestFactory(test)
         factory.generate_tests()
 
+    for test in [run_test_write_stall, run_test_reset]:
+
+        factory = TestFactory(test)
+        factory.generate_tests()
+
+    factory = TestFactory(run_test_credits)
+    factory.add_option(("aw_credits", "w_credits"), [(1, 1), (1, 4), (4, 1), (2, 8)])
+    factory.generate_tests()
+
+    factory = TestFactory(run_test_outstanding)
+    factory.add_option("max_outstanding", [1, 2, 4, 8])
+    factory.generate_tests()
+
     factory = TestFactory(run_stress_test)
+    factory.add_option("max_outstanding", [1, 2, 4])
     factory.generate_tests()
 
 
@@ -0,0 +1,271 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import asyncio
+
+import pytest
+
+from cocotbext.axi.address_space import AddressSpace, MemoryRegion, SparseMemoryRegion, Window
+from cocotbext.axi.bump_allocator import BumpAllocator
+from cocotbext.axi.slab_allocator import SlabAllocator
+
+
+def test_find_regions():
+    address_space = AddressSpace(2**32)
+
+    regions = []
+    for k in reversed(range(16)):
+        region = MemoryRegion(4096)
+        address_space.register_region(region, k*8192)
+        regions.append((k*8192, region))
+
+    assert [r[0] for r in address_space.regions] == [k*8192 for k in range(16)]
+
+    for base, region in regions:
+        assert address_space.find_regions(base+10, 16)[0][3] is region
+        assert address_space.find_regions(base+10, 16)[0][3] is region
+        assert not address_space.find_regions(base+4096, 16)
+
+    # span across a gap
+    found = address_space.find_regions(4000, 8192)
+    assert [r[0] for r in found] == [0, 8192]
+
+    with pytest.raises(ValueError):
+        address_space.register_region(MemoryRegion(4096), 8192+2048)
+
+
+def test_read_write():
+    address_space = AddressSpace(2**32)
+
+    for k in range(4):
+        address_space.register_region(MemoryRegion(4096), k*4096)
+
+    async def run():
+        await address_space.write(4000, bytes(range(200)))
+        assert await address_space.read(4000, 200) == bytes(range(200))
+        assert await address_space.read(4096, 4) == bytes(range(96, 100))
+
+    asyncio.run(run())
+
+
+def test_pool_free():
+    address_space = AddressSpace(2**32)
+    pool = address_space.create_pool(0, 2**20)
+    window_pool = address_space.create_window_pool(2**20, 2**20)
+
+    for k in range(1000):
+        region = pool.alloc_region(4096)
+        window = window_pool.alloc_window(4096)
+        assert pool.find_regions(region.base - pool.base)[0][3] is region
+        pool.free_region(region)
+        window_pool.free_window(window)
+
+    assert not pool.regions
+    assert not pool.allocations
+    assert pool.allocator.free_lists[-1] == {0}
+    assert window_pool.allocator.free_lists[-1] == {0}
+
+    with pytest.raises(ValueError):
+        pool.free_region(region)
+
+
+def test_pool_allocator_type():
+    address_space = AddressSpace(2**32)
+    slab_pool = address_space.create_pool(0, 2**24,
+        allocator_type=lambda size: SlabAllocator(size, size_classes=[64, 4096+64]))
+    bump_pool = address_space.create_pool(2**24, 2**20, allocator_type=BumpAllocator)
+
+    regions = [slab_pool.alloc_region(4096+64) for k in range(64)]
+    bases = sorted(slab_pool.allocations[r] for r in regions)
+    # no power-of-two rounding
+    assert bases[-1] - bases[0] < 64*8192
+
+    for region in regions:
+        slab_pool.free_region(region)
+
+    assert not slab_pool.allocator.slabs
+    assert slab_pool.allocator.allocated == 0
+
+    regions = [bump_pool.alloc_region(100) for k in range(16)]
+    assert [bump_pool.allocations[r] for r in regions] == [k*128 for k in range(16)]
+
+    bump_pool.free_all()
+
+    assert not bump_pool.regions
+    assert bump_pool.allocator.ptr == 0
+    assert bump_pool.alloc_region(100).base == 2**24
+
+
+def test_slab_allocator_defaults():
+    address_space = AddressSpace(2**32)
+    pool = address_space.create_pool(0, 2**24, allocator_type=SlabAllocator,
+        allocator_kwargs={'slab_size': 2**15})
+    assert pool.allocator.slab_size == 2**15
+
+    regions = [pool.alloc_region(4096+64) for k in range(64)]
+    bases = sorted(pool.allocations[r] for r in regions)
+    # default size classes are not all powers of two
+    assert bases[1] - bases[0] == 5120
+
+    window_pool = address_space.create_window_pool(2**24, 2**20, allocator_type=SlabAllocator,
+        allocator_kwargs={'size_classes': [100]})
+    assert window_pool.allocator.size_classes == [128]
+
+    # slab size reduced to fit small pools
+    small_pool = address_space.create_pool(2**25, 3000, allocator_type=SlabAllocator)
+    assert small_pool.allocator.slab_size == 2048
+    regions = [small_pool.alloc_region(100) for k in range(16)]
+    assert len(set(small_pool.allocations[r] for r in regions)) == 16
+
+
+def test_nested_windows():
+    address_space = AddressSpace(2**32)
+    region = MemoryRegion(2**16)
+    address_space.register_region(region, 0x10000)
+
+    class CountingWindow(Window):
+        count = 0
+
+        async def _read(self, address, length, **kwargs):
+            CountingWindow.count += 1
+            return await super()._read(address, length, **kwargs)
+
+    w1 = address_space.create_window(0x10000, 2**16)
+    w2 = w1.create_window(0x1000, 0x4000)
+    w3 = w2.create_window(0x100, 0x1000, window_type=CountingWindow)
+    w4 = w3.create_window(0x10, 0x100)
+
+    assert w2._target is address_space
+    assert w3._target is address_space
+    assert w3._target_offset == 0x11100
+    assert w4._target is w3
+    assert w4.get_absolute_address(0) == 0x11110
+
+    async def run():
+        await w4.write(0, b'test')
+        assert region[0x1110:0x1114] == b'test'
+        assert await w4.read(0, 4) == b'test'
+        assert CountingWindow.count == 1
+
+    asyncio.run(run())
+
+
+def test_translated_window():
+    address_space = AddressSpace(2**32)
+    region = MemoryRegion(2**16)
+    address_space.register_region(region, 0x10000)
+
+    class XorWindow(Window):
+        def get_parent_address(self, address):
+            return super().get_parent_address(address ^ 0x100)
+
+    w1 = address_space.create_window(0x10000, 2**16)
+    w2 = w1.create_window(0x1000, 0x4000, window_type=XorWindow)
+    w3 = w2.create_window(0x10, 0x100)
+
+    assert not w2._is_passthrough()
+    assert w3._target is w2
+
+    async def run():
+        await w2.write(0x10, b'test')
+        assert region[0x1110:0x1114] == b'test'
+        assert await w2.read(0x10, 4) == b'test'
+
+        await w3.write(0, b'abcd')
+        assert region[0x1110:0x1114] == b'abcd'
+        assert await w3.read(0, 4) == b'abcd'
+
+        await w2.fill(0x20, 4, b'x')
+        assert region[0x1120:0x1124] == b'xxxx'
+
+    asyncio.run(run())
+
+
+def test_memory_region_file(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(bytes(range(256))*16)
+
+    region = MemoryRegion.from_file(path)
+    assert region.size == 4096
+    assert region[0:4] == bytes(range(4))
+
+    region[0:4] = b'test'
+    assert path.read_bytes()[0:4] == bytes(range(4))
+
+    region = MemoryRegion.from_file(path, 8192, access='write')
+    region[0:4] = b'test'
+    region.flush()
+    assert path.read_bytes()[0:4] == b'test'
+    assert len(path.read_bytes()) == 8192
+
+
+def test_fill_copy():
+    address_space = AddressSpace(2**32)
+    address_space.register_region(MemoryRegion(4096), 0)
+    address_space.register_region(SparseMemoryRegion(2**20), 4096)
+
+    async def run():
+        await address_space.fill(4000, 200, b'abcd')
+        assert await address_space.read(4000, 200) == b'abcd'*50
+
+        window = address_space.create_window(4096+8192, 8192)
+        await window.fill(0, 8192, 0x55)
+        assert await address_space.read(4096+8190, 4) == b'\x00\x00\x55\x55'
+
+        await address_space.copy(4096+100, 4000, 200)
+        assert await address_space.read(4096+100, 200) == b'abcd'*50
+
+        # overlapping copies behave like memmove
+        await address_space.write(0, bytes(range(256))*5)
+        ref = bytearray(await address_space.read(0, 4096+1024))
+
+        await address_space.copy(0, 100, 1000)
+        ref[0:1000] = ref[100:1100]
+        assert await address_space.read(0, 4096+1024) == ref
+
+        await address_space.copy(20, 0, 1000)
+        ref[20:1020] = ref[0:1000]
+        assert await address_space.read(0, 4096+1024) == ref
+
+        await address_space.copy(4096, 4096+20, 400)
+        ref[4096:4496] = ref[4116:4516]
+        assert await address_space.read(0, 4096+1024) == ref
+        assert await address_space.read(4096, 8) == b'abcdabcd'
+
+    asyncio.run(run())
+
+
+def test_memory_region_watch():
+    region = MemoryRegion(4096)
+    region.watch(100, 4, read=True)
+
+    async def run():
+        await region.write(0, bytes(100))
+        await region.write(98, b'abcd')
+        await region.read(102, 8)
+        await region.copy(200, 96, 8)
+
+    asyncio.run(run())
+
+    assert region.watchpoints.trace == [('w', 98, b'abcd'), ('r', 102, bytes(8)), ('r', 96, bytes(2) + b'abcd' + bytes(2))]
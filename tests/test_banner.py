@@ -0,0 +1,80 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import logging
+
+from cocotbext.axi import banner
+
+
+class DummyBus:
+    _optional_signals = ["user"]
+
+    def __init__(self):
+        self.data = [0]*8
+        self.valid = [0]
+        self._signals = {"data": self.data, "valid": self.valid}
+
+
+class DummyModel(banner.SignalReport):
+    def __init__(self):
+        self.log = logging.getLogger("cocotb.test.dummy")
+        banner.log_banner(self.log, "Dummy model")
+        self._log_config("Dummy model configuration:")
+        self._log_config("  Data width: %d bits", 8)
+        self._init_signal_report("Dummy model signals:", (DummyBus(),))
+
+
+def test_quiet(caplog, monkeypatch):
+    monkeypatch.setattr(banner, "quiet", False)
+    monkeypatch.setattr(banner, "_banner_logged", False)
+
+    with caplog.at_level(logging.INFO):
+        DummyModel()
+    messages = [r.getMessage() for r in caplog.records]
+    assert "Dummy model" in messages
+    assert "  Data width: 8 bits" in messages
+    assert "  data width: 8 bits" in messages
+    assert "  user: not present" in messages
+
+    caplog.clear()
+    banner.set_quiet()
+    with caplog.at_level(logging.INFO):
+        models = [DummyModel() for k in range(4)]
+    assert caplog.records == []
+
+    monkeypatch.setattr(banner, "_banner_logged", False)
+    with caplog.at_level(logging.INFO):
+        DummyModel()
+        DummyModel()
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages.count("https://github.com/alexforencich/cocotbext-axi") == 1
+    assert "Dummy model signals:" not in messages
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        models[0].log_signals()
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[:2] == ["Dummy model configuration:", "  Data width: 8 bits"]
+    assert "Dummy model signals:" in messages
+    assert "  valid width: 1 bits" in messages
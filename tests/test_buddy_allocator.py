@@ -22,6 +22,8 @@ THE SOFTWARE.
 
 """
 
+import random
+
 from cocotbext.axi.buddy_allocator import BuddyAllocator
 
 
@@ -41,4 +43,47 @@ def test_allocator():
         print(f"Free {addr}")
         ba.free(addr)
 
-    assert ba.free_lists[-1] == [0]
+    assert ba.free_lists[-1] == {0}
+    assert ba.allocated == 0
+    assert ba.fragmentation() == 0.0
+
+
+def test_allocator_lowest_first():
+    ba = BuddyAllocator(1024)
+
+    assert [ba.alloc(16) for k in range(4)] == [0, 16, 32, 48]
+
+    ba.free(16)
+    ba.free(32)
+
+    assert ba.alloc(16) == 16
+    assert ba.alloc(16) == 32
+    assert ba.alloc(16) == 64
+
+
+def test_allocator_stress():
+    rng = random.Random(0)
+    ba = BuddyAllocator(2**32, min_alloc=64)
+
+    live = {}
+
+    for k in range(100000):
+        if live and (len(live) > 20000 or rng.random() < 0.4):
+            addr = live.popitem()[0]
+            ba.free(addr)
+        else:
+            size = rng.randrange(1, 65536)
+            addr = ba.alloc(size)
+            assert addr % 2**((max(size, 64)-1).bit_length()) == 0
+            assert addr not in live
+            live[addr] = size
+
+    assert ba.allocated == sum(2**ba.allocations[a] for a in live)
+    assert ba.peak_allocated >= ba.allocated
+    assert 0.0 <= ba.fragmentation() < 1.0
+
+    for addr in list(live):
+        ba.free(addr)
+
+    assert ba.free_lists[-1] == {0}
+    assert ba.free_size() == 2**32
@@ -0,0 +1,55 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+from cocotbext.axi.bus_shape import bus_shape
+
+
+class DummyBus:
+    _optional_signals = ["strb", "user"]
+
+    def __init__(self, width, strb=True):
+        self._signals = {"data": [0]*width, "valid": [0]}
+        if strb:
+            self._signals["strb"] = [0]*(width//8)
+
+
+def test_bus_shape():
+    buses = [DummyBus(32) for k in range(4)]
+    shapes = [bus_shape(bus) for bus in buses]
+
+    # same signature, same shape
+    assert all(shape is shapes[0] for shape in shapes)
+    assert bus_shape(buses[0]) is shapes[0]
+
+    shape = shapes[0]
+    assert shape.has("data")
+    assert shape.has("strb")
+    assert not shape.has("user")
+    assert shape.width("data") == 32
+    assert shape.width("strb") == 4
+    assert [args[0] for msg, args in shape.report] == ["data", "strb", "user", "valid"]
+
+    # different widths or signals, different shape
+    assert bus_shape(DummyBus(64)) is not shape
+    assert not bus_shape(DummyBus(32, strb=False)).has("strb")
@@ -0,0 +1,140 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import asyncio
+import struct
+
+import pytest
+
+from cocotbext.axi.address_space import AddressSpace, MemoryRegion
+from cocotbext.axi.memory_image import detect_format, iter_image
+from cocotbext.axi.sparse_memory import SparseMemory
+
+
+def make_elf(segments, elfclass=2, endian='<'):
+    # segments: list of (paddr, data, memsz)
+    if elfclass == 1:
+        hdr_fmt, ph_fmt = 'HHIIIIIHHHHHH', 'IIIIIIII'
+    else:
+        hdr_fmt, ph_fmt = 'HHIQQQIHHHHHH', 'IIQQQQQQ'
+    ehsize = 16 + struct.calcsize(endian+hdr_fmt)
+    phentsize = struct.calcsize(endian+ph_fmt)
+    offset = ehsize + phentsize*len(segments)
+    ident = b'\x7fELF' + bytes([elfclass, 1 if endian == '<' else 2, 1]) + bytes(9)
+    elf = ident + struct.pack(endian+hdr_fmt, 2, 0, 1, 0, ehsize, 0, 0, ehsize, phentsize, len(segments), 0, 0, 0)
+    data = b''
+    for paddr, seg, memsz in segments:
+        if elfclass == 1:
+            elf += struct.pack(endian+ph_fmt, 1, offset+len(data), paddr, paddr, len(seg), memsz, 0, 0)
+        else:
+            elf += struct.pack(endian+ph_fmt, 1, 0, offset+len(data), paddr, paddr, len(seg), memsz, 0)
+        data += seg
+    return elf + data
+
+
+def make_ihex(base, data):
+    lines = []
+    for k in range(0, len(data), 16):
+        addr = base+k
+        rec = bytes([2, 0, 0, 4]) + (addr >> 16).to_bytes(2, 'big')
+        lines.append(':' + (rec + bytes([-sum(rec) & 0xff])).hex().upper())
+        chunk = data[k:k+16]
+        rec = bytes([len(chunk)]) + (addr & 0xffff).to_bytes(2, 'big') + b'\x00' + chunk
+        lines.append(':' + (rec + bytes([-sum(rec) & 0xff])).hex().upper())
+    lines.append(':00000001FF')
+    return '\n'.join(lines) + '\n'
+
+
+def make_srec(base, data):
+    lines = ['S00600004844521B']
+    for k in range(0, len(data), 16):
+        chunk = data[k:k+16]
+        rec = bytes([len(chunk)+5]) + (base+k).to_bytes(4, 'big') + chunk
+        lines.append('S3' + (rec + bytes([~sum(rec) & 0xff])).hex().upper())
+    lines.append('S70500000000FA')
+    return '\n'.join(lines) + '\n'
+
+
+@pytest.mark.parametrize("elfclass", [1, 2])
+@pytest.mark.parametrize("endian", ['<', '>'])
+def test_elf(tmp_path, elfclass, endian):
+    path = tmp_path / "fw.elf"
+    path.write_bytes(make_elf([(0x1000, b'text'*1000, 4000), (0x20000, b'data', 100)], elfclass, endian))
+
+    assert detect_format(path) == 'elf'
+    assert max(len(d) for a, d in iter_image(path, chunk_size=256)) == 256
+
+    mem = SparseMemory(2**32)
+    mem.write(0x20000, b'\xff'*200)
+    mem.load_image(path)
+
+    assert mem.read(0x1000, 4000) == b'text'*1000
+    assert mem.read(0x20000, 200) == b'data' + bytes(96) + b'\xff'*100
+
+
+@pytest.mark.parametrize("fmt", ['ihex', 'srec', 'bin'])
+def test_text_formats(tmp_path, fmt):
+    data = bytes(k % 251 for k in range(1000))
+    base = 0x1fff0
+
+    if fmt == 'ihex':
+        path = tmp_path / "fw.hex"
+        path.write_text(make_ihex(base, data))
+    elif fmt == 'srec':
+        path = tmp_path / "fw.srec"
+        path.write_text(make_srec(base, data))
+    else:
+        path = tmp_path / "fw.bin"
+        path.write_bytes(data)
+
+    assert detect_format(path) == fmt
+
+    mem = SparseMemory(2**32)
+    mem.load_image(path, base=base if fmt == 'bin' else 0)
+
+    assert mem.read(base, len(data)) == data
+    assert mem.read(base+len(data), 4) == bytes(4)
+
+    if fmt == 'ihex':
+        path.write_text(make_ihex(base, data).replace(':10', ':11', 1))
+        with pytest.raises(ValueError):
+            mem.load_image(path)
+
+
+def test_address_space_elf(tmp_path):
+    path = tmp_path / "fw.elf"
+    path.write_bytes(make_elf([(0x0ff0, b'a'*32, 32), (0x8000, b'b'*16, 16)], 1))
+
+    address_space = AddressSpace(2**32)
+    rom = MemoryRegion(4096)
+    ram = MemoryRegion(4096)
+    address_space.register_region(rom, 0x0000)
+    address_space.register_region(ram, 0x1000)
+    address_space.register_region(MemoryRegion(4096), 0x8000)
+
+    asyncio.run(address_space.load_image(path))
+
+    assert rom[0xff0:0x1000] == b'a'*16
+    assert ram[0:16] == b'a'*16
+    assert asyncio.run(address_space.read(0x8000, 16)) == b'b'*16
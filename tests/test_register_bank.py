@@ -0,0 +1,147 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import asyncio
+
+import pytest
+
+from cocotbext.axi.address_space import AddressSpace, PeripheralRegion
+from cocotbext.axi.register_bank import RegisterField, RegisterBank
+
+
+def test_register_bank():
+    async def run():
+        bank = RegisterBank(0x100)
+
+        ctrl = bank.add_register("ctrl", 0x00, fields=[
+            RegisterField("enable", 0),
+            RegisterField("mode", 4, 4, reset=3),
+            RegisterField("version", 24, 8, access='ro', reset=0x12),
+        ])
+        status = bank.add_register("status", 0x04, fields=[
+            RegisterField("done", 0, access='w1c'),
+            RegisterField("error", 1, access='rc'),
+        ])
+        bank.add_register("key", 0x08, fields=[RegisterField("key", 0, 32, access='wo')])
+
+        with pytest.raises(ValueError):
+            bank.add_register("dup", 0x00)
+        with pytest.raises(ValueError):
+            bank.add_register("unaligned", 0x0e)
+
+        address_space = AddressSpace(2**16)
+        address_space.register_region(bank, 0x1000)
+
+        assert ctrl.value == 0x12000030
+        assert await address_space.read_dword(0x1000) == 0x12000030
+
+        # read only field is not modified
+        await address_space.write_dword(0x1000, 0xffffff51)
+        assert ctrl["enable"] == 1
+        assert ctrl["mode"] == 5
+        assert ctrl["version"] == 0x12
+        assert ctrl.value == 0x12ffff51
+
+        # byte write only touches the addressed lane
+        await address_space.write(0x1001, b'\x00')
+        assert ctrl.value == 0x12ff0051
+        assert await address_space.read(0x1003, 1) == b'\x12'
+
+        # w1c and rc fields
+        status["done"] = 1
+        status["error"] = 1
+        assert await address_space.read_dword(0x1004) == 3
+        assert await address_space.read_dword(0x1004) == 1
+        await address_space.write_dword(0x1004, 0)
+        assert status["done"] == 1
+        await address_space.write_dword(0x1004, 1)
+        assert status["done"] == 0
+
+        # write only field reads as zero
+        await address_space.write_dword(0x1008, 0xdeadbeef)
+        assert bank["key"].value == 0xdeadbeef
+        assert await address_space.read_dword(0x1008) == 0
+
+        # unmapped offsets read as zero and ignore writes
+        await address_space.write_dword(0x1010, 0xffffffff)
+        assert await address_space.read_dword(0x1010) == 0
+
+        # multi-register access
+        assert await address_space.read(0x1000, 12) == bytes.fromhex("5100ff120000000000000000")
+
+        bank.reset()
+        assert ctrl.value == 0x12000030
+
+    asyncio.run(run())
+
+
+def test_register_bank_callbacks():
+    async def run():
+        bank = RegisterBank(0x10)
+
+        log = []
+
+        def on_write(reg, value):
+            log.append((reg.name, value))
+
+        async def on_read(reg):
+            await asyncio.sleep(0)
+            return 0x5a5a
+
+        bank.add_register("cmd", 0x0, on_write=on_write)
+        bank.add_register("counter", 0x4, on_read=on_read)
+
+        await bank.write_dword(0x0, 0x1234)
+        assert log == [("cmd", 0x1234)]
+        assert await bank.read_dword(0x4) == 0x5a5a
+
+    asyncio.run(run())
+
+
+def test_peripheral_region():
+    async def run():
+        class SyncPeripheral:
+            def __init__(self):
+                self.mem = bytearray(16)
+
+            def read(self, address, length, **kwargs):
+                return bytes(self.mem[address:address+length])
+
+            def write(self, address, data, **kwargs):
+                self.mem[address:address+len(data)] = data
+
+        class AsyncPeripheral(SyncPeripheral):
+            async def read(self, address, length, **kwargs):
+                return super().read(address, length)
+
+            async def write(self, address, data, **kwargs):
+                super().write(address, data)
+
+        for obj in [SyncPeripheral(), AsyncPeripheral()]:
+            region = PeripheralRegion(obj, 16)
+            await region.write(4, b'test')
+            assert await region.read(4, 4) == b'test'
+            assert obj.mem[4:8] == b'test'
+
+    asyncio.run(run())
@@ -0,0 +1,442 @@
+"""
+
+Copyright (c) 2025 Alex Forencich
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+"""
+
+import pytest
+
+from cocotbext.axi.address_space import MemoryRegion
+from cocotbext.axi.memory import Memory
+from cocotbext.axi.sparse_memory import SparseMemory
+from cocotbext.axi.utils import numpy
+
+
+@pytest.mark.parametrize("page_size", [16, 4096, 2**20])
+def test_read_write(page_size):
+    mem = SparseMemory(2**64, page_size=page_size)
+
+    assert mem.read(2**40, 100) == bytes(100)
+    assert not mem.segs
+
+    base = 100*page_size
+    test_data = bytes(k % 256 for k in range(3*page_size+100))
+    mem.write(base-50, test_data)
+
+    assert mem.read(base-50, len(test_data)) == test_data
+    assert mem.read(base-60, 20) == bytes(10) + test_data[0:10]
+    assert mem[base] == test_data[50]
+    assert mem[base:base+4] == test_data[50:54]
+    assert len(mem.segs) == (base-50+len(test_data)-1)//page_size - (base-50)//page_size + 1
+
+    mem[0:4] = b'test'
+    assert mem.read(0, 4) == b'test'
+
+    with pytest.raises(ValueError):
+        SparseMemory(2**64, page_size=1000)
+
+
+def test_snapshot():
+    mem = SparseMemory(2**64)
+
+    mem.write(0, b'a'*8192)
+    snap1 = mem.snapshot()
+
+    mem.write(4096, b'b'*4)
+    mem.write(2**32, b'c'*4)
+    assert snap1[0] is mem.segs[0]
+    assert snap1[4096] is not mem.segs[4096]
+
+    snap2 = mem.snapshot()
+    mem.write(4096, b'd'*4)
+    mem.clear()
+
+    mem.restore(snap1)
+    assert mem.read(4096, 8) == b'a'*8
+    assert mem.read(2**32, 4) == bytes(4)
+
+    mem.write(0, b'e'*4)
+    assert snap1[0][0:4] == b'aaaa'
+
+    mem.restore(snap2)
+    assert mem.read(0, 4) == b'aaaa'
+    assert mem.read(4096, 8) == b'bbbbaaaa'
+    assert mem.read(2**32, 4) == b'cccc'
+
+
+def test_snapshot_layered():
+    mem = SparseMemory(2**64)
+
+    for k in range(16):
+        mem.write(k*4096, bytes([k])*4096)
+    snaps = [mem.snapshot()]
+    assert len(snaps[0].pages) == 16
+
+    for k in range(4):
+        mem.write(k*4096, b'x')
+        mem.fill(15*4096, 4096)
+        snaps.append(mem.snapshot())
+
+    # only pages touched since the previous snapshot are recorded
+    assert [len(snap.pages) for snap in snaps[1:]] == [2, 2, 2, 2]
+    assert 15*4096 not in snaps[1]
+
+    mem.restore(snaps[0])
+    assert mem.read(0, 1) == b'\x00'
+    assert mem.read(15*4096, 1) == b'\x0f'
+
+    mem.restore(snaps[2])
+    assert mem.read(0, 4096) == b'x' + bytes(4095)
+    assert mem.read(4096, 2) == b'x\x01'
+    assert mem.read(15*4096, 1) == b'\x00'
+
+    # layers are collapsed once they add up to the number of pages
+    for k in range(32):
+        mem.write(0, bytes([k]))
+        snap = mem.snapshot()
+    assert snap.layered < 2*16
+    mem.write(0, b'y')
+    mem.restore(snap)
+    assert mem.read(0, 1) == b'\x1f'
+
+
+def test_snapshot_backing(tmp_path):
+    path = tmp_path / "mem.bin"
+    path.write_bytes(bytes(range(256))*16)
+
+    mem = SparseMemory.from_file(path, 2**32, base=0x1000)
+    mem.write(0x1000, b'test')
+    snap = mem.snapshot()
+    mem.clear()
+    assert mem.read(0x1000, 8) == bytes(8)
+
+    mem.restore(snap)
+    assert mem.path == path
+    assert mem.read(0x1000, 8) == b'test' + bytes(range(4, 8))
+    assert mem.read(0x1100, 4) == bytes(range(4))
+
+    ckpt = tmp_path / "mem.ckpt"
+    mem.save(ckpt)
+    mem.load(ckpt)
+    snap = mem.snapshot()
+    mem.clear()
+    mem.restore(snap)
+    assert mem.read(0x1000, 8) == b'test' + bytes(range(4, 8))
+    assert mem.read(0x1100, 4) == bytes(range(4))
+
+
+def test_dirty_tracking():
+    mem = SparseMemory(2**64)
+    golden = SparseMemory(2**64, page_size=256)
+
+    mem.write(0, b'test')
+    mem.write(4094, b'test')
+    mem.write(2**32, b'test')
+    mem.write(0, b'test')
+
+    assert sorted(mem.dirty) == [0, 4096, 2**32]
+    assert mem.page_write_count == {0: 3, 4096: 1, 2**32: 1}
+    assert mem.page_last_write[0] == 4
+    assert [a for a, p in mem.iter_pages()] == [0, 4096, 2**32]
+
+    mem.clear_dirty()
+    mem.write(8192, bytes(4))
+    assert [a for a, p in mem.iter_dirty_pages()] == [8192]
+
+    golden.write(0, b'test')
+    golden.write(4094, b'test')
+    golden.write(2**32, b'tset')
+
+    assert mem.diff(golden) == [2**32]
+    assert golden.diff(mem) == [2**32]
+
+    golden.write(2**32, b'test')
+    assert mem.diff(golden) == []
+
+
+def test_file_backing(tmp_path):
+    path = tmp_path / "image.bin"
+    data = bytes(k % 251 for k in range(10000))
+    path.write_bytes(data)
+
+    mem = SparseMemory.from_file(path, size=2**32, base=0x1000)
+
+    assert mem.read(0x1000, len(data)) == data
+    assert mem.read(0x1000+len(data), 16) == bytes(16)
+    assert not mem.segs
+
+    mem.write(0x2000, b'test')
+    assert len(mem.segs) == 1
+    assert mem.read(0x1ffe, 8) == data[0xffe:0x1000] + b'test' + data[0x1004:0x1006]
+    assert path.read_bytes() == data
+
+    mem2 = SparseMemory(2**32)
+    mem2.write(0x1000, data)
+    assert mem.diff(mem2) == [0x2000]
+
+    mem.flush()
+    assert path.read_bytes() == data[0:0x1000] + b'test' + data[0x1004:]
+
+
+def test_file_backing_empty(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b'')
+
+    mem = SparseMemory.from_file(path, size=2**32, base=0x1000)
+
+    assert mem.read(0x1000, 16) == bytes(16)
+    assert list(mem.iter_pages()) == []
+    mem.write(0x1000, b'test')
+    assert mem.read(0x1000, 4) == b'test'
+
+    # nothing in the file to write back
+    mem.flush()
+    assert path.read_bytes() == b''
+    mem.close()
+
+
+def test_fill_copy():
+    mem = SparseMemory(2**64)
+
+    mem.fill(100, 10000, b'abc')
+    assert mem.read(100, 9) == b'abcabcabc'
+    assert mem.read(4096, 3) == b'abcabcabc'[(4096-100) % 3:][0:3]
+    assert mem.read(10098, 4) == b'ca' + bytes(2)
+
+    mem.fill(0, 3*4096+10)
+    assert sorted(mem.segs) == [3*4096]
+    assert mem.read(0, 10200) == bytes(10200)
+
+    mem.write(0, bytes(range(256)))
+    mem.copy(10, 0, 256)
+    assert mem.read(10, 256) == bytes(range(256))
+    mem.copy(0, 10, 256)
+    assert mem.read(0, 256) == bytes(range(256))
+
+    mem.copy(2**40, 0, 256)
+    assert mem.read(2**40, 256) == bytes(range(256))
+
+
+def test_words():
+    mem = Memory(2**32)
+
+    mem.write_words(0, [0x1234, 0x5678])
+    assert mem.read(0, 4) == b'\x34\x12\x78\x56'
+    mem.write_dwords(4, [0x12345678], 'big')
+    assert mem.read(4, 4) == b'\x12\x34\x56\x78'
+    mem.write_words(8, [0x123456], ws=3)
+    assert mem.read_words(8, 1, ws=3) == [0x123456]
+
+    qwords = [k*0x0101010101010101 for k in range(256)]
+    mem.write_qwords(4096, qwords)
+    assert mem.read_qwords(4096, 256) == qwords
+    assert mem.read_qwords(4096, 256, 'big') == qwords
+
+    arr = mem.read_words_array(4096, 256, ws=8)
+    assert list(arr) == qwords
+    mem.write_words(8192, arr, 'big', ws=8)
+    assert mem.read_words(8192, 256, 'big', ws=8) == qwords
+
+    if numpy is not None:
+        arr = mem.read_words_ndarray(4096, 512, ws=4)
+        assert arr.dtype == numpy.dtype('<u4')
+        mem.write_words(16384, arr, 'big', ws=4)
+        assert mem.read_words(16384, 512, 'big', ws=4) == list(arr)
+
+    with pytest.raises(OverflowError):
+        mem.write_words(0, [0x10000])
+    with pytest.raises(OverflowError):
+        mem.write_dwords(0, [-1])
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_checkpoint(tmp_path, compress):
+    path = tmp_path / "mem.ckpt"
+
+    mem = SparseMemory(2**64)
+    mem.write(0, b'test'*2000)
+    mem.write(2**40, bytes(range(256))*16)
+    mem.write(2**50, bytes(4096))
+    mem.save(path, compress)
+
+    if compress:
+        assert path.stat().st_size < 4096
+    else:
+        assert path.stat().st_size < 4*4096
+
+    mem2 = SparseMemory(2**32, page_size=256)
+    mem2.load(path)
+
+    assert mem2.size == 2**64
+    assert mem2.page_size == 4096
+    assert not mem2.segs
+    assert mem2.read(0, 8000) == b'test'*2000
+    assert mem2.read(2**40, 4096) == bytes(range(256))*16
+    assert mem2.diff(mem) == []
+
+    mem2.write(2**40, b'abcd')
+    assert mem2.read(2**40, 8) == b'abcd' + bytes(range(4, 8))
+    assert mem2.diff(mem) == [2**40]
+
+
+def test_checkpoint_overwrite(tmp_path):
+    path = tmp_path / "mem.ckpt"
+
+    mem = SparseMemory(2**32)
+    mem.write(0, bytes(range(256))*32)
+    mem.save(path, compress=False)
+
+    # save back to the file the memory is loaded from
+    mem2 = SparseMemory(2**32)
+    mem2.load(path)
+    mem2.write(0x1000, b'abcd')
+    mem2.save(path, compress=False)
+    assert mem2.read(0, 8) == bytes(range(8))
+    assert mem2.read(0x1000, 8) == b'abcd' + bytes(range(4, 8))
+
+    mem3 = SparseMemory(2**32)
+    mem3.load(path)
+    assert mem3.read(0, 8192) == mem2.read(0, 8192)
+
+    backing = mem3.backing
+    mem3.clear()
+    assert mem3.backing is None
+    assert backing.buf.closed
+    mem2.close()
+
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_watchpoints():
+    mem = SparseMemory(2**64)
+    hits = []
+
+    h1 = mem.watch(0x1000, 16)
+    mem.watch(0x2000, 4096, lambda op, addr, data: hits.append((op, addr, bytes(data))), read=True)
+
+    mem.write(0x0ff0, b'a'*16)
+    mem.write(0x0ff8, b'b'*16)
+    mem.write(0x1010, b'c'*16)
+    mem.read(0x1000, 16)
+    mem.write(0x2ffe, b'dddd')
+    mem.read(0x1fff, 2)
+    mem.fill(0x2000, 4096)
+
+    assert mem.watchpoints.trace == [('w', 0x0ff8, b'b'*16)]
+    assert hits == [('w', 0x2ffe, b'dddd'), ('r', 0x1fff, b'\x00\x00'), ('w', 0x2000, bytes(4096))]
+
+    mem.unwatch(h1)
+    mem.write(0x1000, b'e')
+    assert len(mem.watchpoints.trace) == 1
+
+    with pytest.raises(ValueError):
+        mem.unwatch(h1)
+
+
+def test_digest():
+    mem = SparseMemory(2**64)
+    mem2 = SparseMemory(2**64)
+
+    mem.write(100, bytes(range(256))*40)
+    mem2.write(100, bytes(range(256))*40)
+    mem2.write(2**40, bytes(4096))
+
+    assert mem.digest() == mem2.digest()
+    assert mem.equals(mem2)
+    assert mem._digests
+
+    mem2.write(5000, b'x')
+    assert not mem.equals(mem2)
+    assert mem.equals(mem2, 0, 4096)
+    assert mem.digest(0, 4096) == mem2.digest(0, 4096)
+    assert mem.digest(0, 5001) != mem2.digest(0, 5001)
+
+
+def test_digest_external_buffer():
+    buf = bytearray(8192)
+    region = MemoryRegion(8192, buf)
+    mem = SparseMemory(8192)
+
+    assert not region.cache_digests
+    assert region.equals(mem)
+
+    # buffer modified behind the region's back
+    buf[5000] = 1
+    assert not region.equals(mem)
+    assert not region._digests
+    mem.write(5000, b'\x01')
+    assert region.equals(mem)
+
+    region = MemoryRegion(8192)
+    assert region.cache_digests
+    region.digest()
+    region.mem[100] = 1
+    assert region.equals(SparseMemory(8192))
+    region.invalidate_digests()
+    assert not region.equals(SparseMemory(8192))
+
+
+@pytest.mark.parametrize("page_size", [256, 4096, 8192, 65536])
+def test_digest_page_size(page_size):
+    mem = SparseMemory(2**20)
+    mem2 = SparseMemory(2**20, page_size=page_size)
+    region = MemoryRegion(2**20)
+
+    data = bytes(range(256))*40
+    for m in (mem, mem2):
+        m.write(100, data)
+        m.write(0x10000-2, b'abcd')
+    region.mem[100:100+len(data)] = data
+    region.mem[0x10000-2:0x10000+2] = b'abcd'
+
+    for address, length in [(0, None), (0, 4096), (50, 9000), (4096, 8192), (0x10000-3, 5)]:
+        assert mem.digest(address, length) == mem2.digest(address, length)
+        assert mem.digest(address, length) == region.digest(address, length)
+        assert mem.equals(mem2, address, length)
+        assert mem2.equals(mem, address, length)
+        assert mem2.equals(region, address, length)
+        assert region.equals(mem2, address, length)
+
+    mem2.write(0x9000, b'x')
+    assert not mem.equals(mem2)
+    assert not mem2.equals(region)
+    assert mem.equals(mem2, 0, 0x9000)
+    assert mem2.equals(region, 0x9001)
+    assert mem.digest(0x9001) == mem2.digest(0x9001)
+
+    mem.write(0x9000, b'x')
+    region.mem[0x9000] = ord('x')
+    region.invalidate_digests(0x9000, 1)
+    assert mem.equals(mem2)
+    assert mem2.equals(region)
+
+    mem2.write(5000, bytes(range(256))[(5000-100) % 256:][0:1])
+    assert mem.equals(mem2)
+
+    region = MemoryRegion(16384)
+    region[100:100+10240] = bytes(range(256))*40
+    assert region.digest() == mem.digest(0, 16384)
+    assert mem.equals(region, 0, 16384)
+    assert region.equals(mem, 0, 16384)
+
+    region[16383] = 1
+    assert not region.equals(mem, 0, 16384)
+    assert region.equals(mem, 0, 16383)